@@ -2,6 +2,7 @@ from placetmachine.placet import Placet
 from placetmachine.util import CoordTransformation
 from placetmachine.lattice import Beamline, Knob
 from placetmachine.machine import Machine
+from placetmachine.pool import MachinePool
 from placetmachine.beam import Beam
 
 __version__ = '0.0.1'
@@ -116,6 +116,9 @@ class Beam:
 		```
 		["sliced", "partice", None]
 		```
+	parameters : Optional[dict]
+		The parameters the beam was created with, including the offsets added afterwards.
+		`None` if the beam is not created yet or its particles are generated randomly.
 	_data_folder_ : str
 		The name of the folder where the temporary files produced by **Placet** are stored.
 	"""
@@ -137,6 +140,7 @@ class Beam:
 			self.beam_type = beam_type
 		else:
 			raise ValueError(f"Incorrect beam type - '{beam_type}'")
+		self.parameters = None
 		
 		self.dict = tempfile.TemporaryDirectory()
 		self._data_folder_ = self.dict.name
@@ -227,6 +231,7 @@ class Beam:
 		self.placet.InjectorBeam(self.name, **beam_setup)
 		
 		self.placet.SetRfGradientSingle(self.name, 0, "{" + str(grad) +  " 0.0 0.0}")
+		self.parameters = dict(extra_params, n_slice = n_slice, n_macroparticles = n_macroparticles, eng = eng, grad = grad, beam_seed = beam_seed)
 	
 	def make_beam_many(self, n_slice: int, n: int, **extra_params):
 		"""
@@ -318,6 +323,8 @@ class Beam:
 		particles_distribution.to_csv(os.path.join(self._data_folder_, "particles.in"), sep = ' ', index = False, header = False)
 
 		self.placet.BeamRead(beam = self.name, file = os.path.join(self._data_folder_, "particles.in"))
+		# the particles are generated randomly, so the beam cannot be reproduced from its parameters
+		self.parameters = None
 
 	def offset_beam(self, **extra_params):
 		"""
@@ -341,4 +348,6 @@ class Beam:
 		end : int
 			Last particle to offset.
 		"""
-		self.placet.BeamAddOffset(**dict(extra_params, beam = self.name))
\ No newline at end of file
+		self.placet.BeamAddOffset(**dict(extra_params, beam = self.name))
+		if self.parameters is not None:
+			self.parameters = dict(self.parameters, offsets = self.parameters.get('offsets', ()) + (tuple(sorted(extra_params.items())),))
\ No newline at end of file
@@ -2,6 +2,7 @@ from typing import List, Optional, Tuple
 from pandas import DataFrame
 import warnings
 import copy
+import numpy as np
 from placetmachine.lattice import Element
 
 
@@ -121,6 +122,10 @@ class Knob:
 					dict_tmp[coord]['step_size'] = None
 
 			self.variables.append(dict_tmp)
+
+		# the (element index, coordinate) pairs and their amplitudes, used by `apply()` without a strategy
+		self._coords = [(i, coord) for i, variables in enumerate(self.variables) for coord in variables]
+		self._coords_amplitudes = np.array([self.variables[i][coord]['amplitude'] for i, coord in self._coords], dtype = float)
 			
 
 		# checking the supported types and building the types involved
@@ -149,13 +154,13 @@ class Knob:
 		Consequently resets the following attributes: `amplitude`, `mismatch`, and `changes`. 
 		"""
 		self.amplitude, self.amplitude_mismatch = 0.0, 0.0
-		for i, element in enumerate(self.elements):
-			for coord in self.variables[i]:
-				element[coord] -= self.variables[i][coord]['change']
-				element._mismatch[coord] -= self.variables[i][coord]['mismatch']
+		for element, variables in zip(self.elements, self.variables):
+			for coord, variable in variables.items():
+				element[coord] -= variable['change']
+				element._mismatch[coord] -= variable['mismatch']
 
-				self.variables[i][coord]['change'] = 0.0			
-				self.variables[i][coord]['mismatch'] = 0.0
+				variable['change'] = 0.0			
+				variable['mismatch'] = 0.0
 
 
 	def apply(self, amplitude: float, **kwargs):
@@ -194,10 +199,11 @@ class Knob:
 			raise ValueError(f"Unacceptable apply strategy - '{strategy}'")
 		
 		if strategy is None:
-			for i, element in enumerate(self.elements):
-				for coord in self.variables[i]:
-					element[coord] += self.variables[i][coord]['amplitude'] * amplitude
-					self.variables[i][coord]['change'] += self.variables[i][coord]['amplitude'] * amplitude
+			# all the coordinates changes are evaluated with a single multiplication
+			changes = (self._coords_amplitudes * amplitude).tolist()
+			for (i, coord), change in zip(self._coords, changes):
+				self.elements[i][coord] += change
+				self.variables[i][coord]['change'] += change
 			self.amplitude += amplitude
 
 		if strategy == "simple":
@@ -298,11 +304,13 @@ class Knob:
 			self.amplitude_mismatch += amplitude + self.amplitude - amplitude_tmp
 
 		amplitude = amplitude_tmp - self.amplitude # new amplitude to apply
+		# the knob amplitude after applying
+		total_amplitude = self.amplitude + amplitude
 
-		for i, element in enumerate(self.elements):
-			for coord in self.variables[i]:
-				coord_amplitude = self.variables[i][coord]['amplitude']
-				coord_step_size = self.variables[i][coord]['step_size']
+		for element, variables in zip(self.elements, self.variables):
+			for coord, variable in variables.items():
+				coord_amplitude = variable['amplitude']
+				coord_step_size = variable['step_size']
 
 				coord_change = coord_amplitude * amplitude
 
@@ -319,19 +327,19 @@ class Knob:
 							new_coord_change = (n_step_sizes - 1) * coord_step_size
 
 					# updating the values
-					self.variables[i][coord]['change'] += new_coord_change
+					variable['change'] += new_coord_change
 
-					old_mismatch = self.variables[i][coord]['mismatch']
+					old_mismatch = variable['mismatch']
 
-					self.variables[i][coord]['mismatch'] = coord_amplitude * (self.amplitude + amplitude) - self.variables[i][coord]['change']
+					variable['mismatch'] = coord_amplitude * total_amplitude - variable['change']
 
 					# mismatch is accumulated with respect to the individual elements
-					element._mismatch[coord] += self.variables[i][coord]['mismatch'] - old_mismatch
+					element._mismatch[coord] += variable['mismatch'] - old_mismatch
 
 					element[coord] += new_coord_change
 				else:
 					element[coord] += coord_change
-					self.variables[i][coord]['change'] += coord_change
+					variable['change'] += coord_change
 
 		self.amplitude += amplitude
 
@@ -378,14 +386,17 @@ class Knob:
 			self.amplitude_mismatch += amplitude + self.amplitude - amplitude_tmp
 
 		amplitude = amplitude_tmp - self.amplitude # new amplitude to apply
+		# the knob amplitude after applying
+		total_amplitude = self.amplitude + amplitude
+		use_global_mismatch = extra_params.get('use_global_mismatch', True)
 		
-		for i, element in enumerate(self.elements):
-			for coord in self.variables[i]:
-				coord_amplitude = self.variables[i][coord]['amplitude']
-				coord_step_size = self.variables[i][coord]['step_size']
+		for element, variables in zip(self.elements, self.variables):
+			for coord, variable in variables.items():
+				coord_amplitude = variable['amplitude']
+				coord_step_size = variable['step_size']
 
 				coord_change = coord_amplitude * amplitude
-				coord_change += element._mismatch[coord] if extra_params.get('use_global_mismatch', True) else self.variables[i][coord]['mismatch']
+				coord_change += element._mismatch[coord] if use_global_mismatch else variable['mismatch']
 
 				if coord_step_size is not None:
 					n_step_sizes = int(coord_change / coord_step_size)
@@ -400,18 +411,18 @@ class Knob:
 							new_coord_change = (n_step_sizes - 1) * coord_step_size
 
 					# updating the values
-					self.variables[i][coord]['change'] += new_coord_change
+					variable['change'] += new_coord_change
 
-					old_mismatch = self.variables[i][coord]['mismatch']
-					self.variables[i][coord]['mismatch'] = coord_amplitude * (self.amplitude + amplitude) - self.variables[i][coord]['change']
+					old_mismatch = variable['mismatch']
+					variable['mismatch'] = coord_amplitude * total_amplitude - variable['change']
 
 					# mismatch is accumulated with respect to the individual elements
-					element._mismatch[coord] += self.variables[i][coord]['mismatch'] - old_mismatch
+					element._mismatch[coord] += variable['mismatch'] - old_mismatch
 
 					element[coord] += new_coord_change
 				else:
 					element[coord] += coord_change
-					self.variables[i][coord]['change'] += coord_change
+					variable['change'] += coord_change
 		
 		self.amplitude += amplitude
 
@@ -558,14 +569,17 @@ class Knob:
 		# this could be different from the correct amplitude required:
 		# which is amplitude + self.amplitude_mismatch
 		self.amplitude_mismatch += amplitude - amplitude_adjusted
-
-		for i, element in enumerate(self.elements):
-			for coord in self.variables[i]:
-				coord_amplitude = self.variables[i][coord]['amplitude']
-				coord_step_size = self.variables[i][coord]['step_size']
+		# the knob amplitude after applying
+		total_amplitude = self.amplitude + amplitude_adjusted
+		use_global_mismatch = extra_params.get('use_global_mismatch', True)
+
+		for element, variables in zip(self.elements, self.variables):
+			for coord, variable in variables.items():
+				coord_amplitude = variable['amplitude']
+				coord_step_size = variable['step_size']
 				
 				coord_change = coord_amplitude * amplitude_adjusted
-				coord_change += element._mismatch[coord] if extra_params.get('use_global_mismatch', True) else self.variables[i][coord]['mismatch']
+				coord_change += element._mismatch[coord] if use_global_mismatch else variable['mismatch']
 
 				n_step_sizes = int(coord_change / coord_step_size)
 				
@@ -578,13 +592,13 @@ class Knob:
 					else:
 						new_coord_change = (n_step_sizes - 1) * coord_step_size
 
-				self.variables[i][coord]['change'] += new_coord_change
+				variable['change'] += new_coord_change
 				
-				old_mismatch = self.variables[i][coord]['mismatch']
+				old_mismatch = variable['mismatch']
 				
-				self.variables[i][coord]['mismatch'] = coord_amplitude * (self.amplitude + amplitude_adjusted) - self.variables[i][coord]['change']
+				variable['mismatch'] = coord_amplitude * total_amplitude - variable['change']
 				
-				element._mismatch[coord] += self.variables[i][coord]['mismatch'] - old_mismatch
+				element._mismatch[coord] += variable['mismatch'] - old_mismatch
 				element[coord] += new_coord_change
 
 		self.amplitude += amplitude_adjusted
@@ -193,6 +193,13 @@ class Beamline:
 			Name of the beamline.
 		"""
 		self.name, self.lattice, self.attached_knobs, self.girders = name, [], [], []
+		# incremented every time the lattice structure changes, used to invalidate the derived caches
+		self._topology_version = 0
+		# ids of the knobs in `attached_knobs`, for constant time membership checks
+		self._attached_knob_ids = set()
+		self._lattice_set, self._lattice_set_version = set(), 0
+		# element type -> (topology version, list of the elements of that type)
+		self._elements_by_type = {}
 
 	def __repr__(self):
 		return f"Beamline('{self.name}') && lattice = {list(map(lambda x: repr(x), self.lattice))}"
@@ -267,7 +274,7 @@ class Beamline:
 			new_element.index = self.lattice[-1].index + 1
 		
 		self.lattice.append(new_element)
-		
+		self._topology_version += 1
 
 	def __setitem__(self, index: int, element: Element):
 		#
@@ -285,6 +292,7 @@ class Beamline:
 					girder.elements[i] = new_element
 					new_element.girder = girder
 		self.lattice[index] = new_element
+		self._topology_version += 1
 
 	def __getitem__(self, index: int):
 		return self.lattice[index]
@@ -326,7 +334,7 @@ class Beamline:
 		knob
 			The knob to attach to the lattice.
 		"""
-		if knob in self.attached_knobs:
+		if id(knob) in self._attached_knob_ids:
 			warnings.warn(f"The knob already attached!")
 		else:
 			# Verifying the elements in the given Knob exist in the Beamline
@@ -335,6 +343,7 @@ class Beamline:
 					warnings.warn(f"One or few elements used in the Knob are not present in this Beamline! Knob is not attached")
 					return
 			self.attached_knobs.append(knob)
+			self._attached_knob_ids.add(id(knob))
 
 	def realign_elements(self, specific_parameters: Optional[Union[str, List[str]]] = None):
 		"""
@@ -379,6 +388,28 @@ class Beamline:
 				element.settings[parameter] = 0.0
 		
 
+	def _get_lattice_set(self) -> set:
+		"""
+		Get the set of the elements in the lattice.
+
+		The set is rebuilt only when the lattice structure changes.
+		"""
+		if self._lattice_set_version != self._topology_version:
+			self._lattice_set, self._lattice_set_version = set(self.lattice), self._topology_version
+		return self._lattice_set
+
+	def _get_elements_of_type(self, element_type: str) -> List[Element]:
+		"""
+		Get the list of the elements of the given type.
+
+		The list is rebuilt only when the lattice structure changes.
+		"""
+		version, elements = self._elements_by_type.get(element_type, (None, None))
+		if version != self._topology_version:
+			elements = list(self.extract(element_type))
+			self._elements_by_type[element_type] = (self._topology_version, elements)
+		return elements
+
 	def cache_lattice_data(self, elements: List[Element]):
 		"""
 		Cache up the data for certain elements.
@@ -389,7 +420,7 @@ class Beamline:
 			The list of the elements' references to cache.
 			Each element in the list must be present in the Beamline.
 		"""
-		lattice_set = set(self.lattice)
+		lattice_set = self._get_lattice_set()
 		for element in elements:
 			if element not in lattice_set:
 				raise ValueError(f"Given element is not present in the Beamline!")
@@ -407,7 +438,7 @@ class Beamline:
 		clear_cache
 			If `True`, clears the cached data.
 		"""
-		lattice_set = set(self.lattice)
+		lattice_set = self._get_lattice_set()
 		for element in elements:
 			if element not in lattice_set:
 				raise ValueError(f"Given element is not present in the Beamline!")
@@ -549,15 +580,15 @@ class Beamline:
 
 	def _get_quads_strengths(self) -> List[float]:
 		"""Get the list of the quadrupoles strengths | Created for the use with Placet.QuadrupoleSetStrengthList() """
-		return [quad['strength'] for quad in self.extract(['Quadrupole'])]
+		return [quad.settings['strength'] for quad in self._get_elements_of_type('Quadrupole')]
 
 	def _get_cavs_gradients(self) -> List[float]:
 		"""Get the list of the cavs gradients | Created for the use with Placet.CavitySetGradientList() """
-		return [cav['gradient'] for cav in self.extract(['Cavity'])]
+		return [cav.settings['gradient'] for cav in self._get_elements_of_type('Cavity')]
 
 	def _get_cavs_phases(self) -> List[float]:
 		"""Get the list of the cavs phases | Created for the use with Placet.CavitySetGradientList() """
-		return [cav['phase'] for cav in self.extract(['Cavity'])]
+		return [cav.settings['phase'] for cav in self._get_elements_of_type('Cavity')]
 
 	'''Misalignment routines'''
 	def misalign_element(self, **extra_params):
@@ -5,11 +5,20 @@ import pandas as pd
 from rich.console import Console
 from rich.errors import LiveError
 from functools import wraps
+from contextlib import nullcontext
 import numpy as np
 from rich.table import Table
 from rich.live import Live
 import tempfile
+import hashlib
+try:
+	import orjson
+	_dumps = lambda obj: orjson.dumps(obj, option = orjson.OPT_SERIALIZE_NUMPY).decode()
+except ImportError:
+	import json
+	_dumps = json.dumps
 from placetmachine import Placet, Beamline
+from placetmachine.placet import acquire_placet, release_placet
 from placetmachine.lattice import Knob
 from placetmachine.beam import Beam
 
@@ -17,15 +26,36 @@ from placetmachine.beam import Beam
 _extract_subset = lambda _set, _dict: list(filter(lambda key: key in _dict, _set))
 _extract_dict = lambda _set, _dict: {key: _dict[key] for key in _extract_subset(_set, _dict)}
 
-_get_data = lambda name: list(map(lambda x: [float(y) for y in x.split()], open(name, 'r')))
-def get_data(filename) -> List:
-	res = _get_data(filename)
-	if res[-1] == []:
-		res.pop(len(res) - 1)
-	return res
+def _iter_data_chunks(filename: str, n_columns: int, chunk_size: int = 10000):
+	"""
+	Read the whitespace separated float data file in chunks of `chunk_size` rows.
+
+	Only the first `n_columns` columns are read. Yields 2D numpy arrays.
+	"""
+	with pd.read_csv(filename, sep = r'\s+', header = None, usecols = range(n_columns), dtype = np.float64, 
+			engine = 'c', chunksize = chunk_size) as reader:
+		for chunk in reader:
+			yield chunk.to_numpy()
 
 cut = lambda data, index: list(map(lambda x: x[index], data))
 
+# columns of the beam dumps produced by `Machine.save_sliced_beam()` and `Machine.save_beam()`
+_TRACK_COLUMNS = {
+	'sliced': ['s', 'weight', 'E', 'x', 'px', 'y', 'py', 'sigma_xx', 'sigma_xpx', 'sigma_pxpx', 'sigma_yy', 'sigma_ypy', 'sigma_pypy', 'sigma_xy', 'sigma_xpy', 'sigma_yx', 'sigma_ypx'],
+	'particle': ['E', 'x', 'y', 'z', 'px', 'py']
+}
+
+# columns of the twiss file produced by `Placet.TwissPlotStep()` that are used, with their positions
+_TWISS_HEADER_LINES = 18
+_TWISS_COLUMNS = {'id': 0, 's': 1, 'E': 2, 'betx': 5, 'alfx': 6, 'bety': 9, 'alfy': 10, 'Dx': 11, 'Dy': 13}
+
+# the label columns of the tracking and correction summaries, the same in every row
+_SUMMARY_LABELS = ['correction', 'beam', 'beamline', 'survey', 'positions_file']
+
+# observables supported by `Machine.eval_obs()` and `Machine.iterate_knob()`
+_EMIT_OBS = frozenset({'emittx', 'emitty'})
+_ALL_OBS = frozenset(_TRACK_COLUMNS['sliced']) | _EMIT_OBS
+
 def term_logging(func: Callable):
 	"""Decorator with the fancy status logging"""
 	def status_message(func_name):
@@ -78,8 +108,11 @@ def update_misalignments(func: Callable):
 	"""Decorator for updating the beamline alignment"""
 	@wraps(func)
 	def wrapper(self, *args, **kwargs):
+		self._misalignments_synced = False
 		res = func(self, *args, **kwargs)
-		self._update_lattice_misalignments(cav_bpm = 1, cav_grad_phas = 1)
+		# the decorated function might have already synced the offsets (eg. in `verify_survey`)
+		if not self._misalignments_synced:
+			self._update_lattice_misalignments(cav_bpm = 1, cav_grad_phas = 1)
 		return res
 	return wrapper
 
@@ -116,8 +149,9 @@ def verify_survey(func: Callable):
 			# One of the Placet built-in surveys
 			result = func(self, beam, survey, **kwargs)
 
-			# syncing the offsets in `Machine.beamline` with Placet
-			self._update_lattice_misalignments(cav_bpm = 1, cav_grad_phas = 1)
+			# syncing the offsets in `Machine.beamline` with Placet. 'None' survey does not change the offsets
+			if survey != "None":
+				self._update_lattice_misalignments(cav_bpm = 1, cav_grad_phas = 1)
 		else:
 			raise ValueError(f"'{survey}' - incorrect survey. Accepted values are: {Machine.surveys + Placet.surveys}.")			
 		
@@ -143,11 +177,17 @@ def verify_beam(func: Callable):
 	return wrapper
 
 def add_beamline_to_final_dataframe(func: Callable):
-	"""Decorator used to add the Beamline name used in the tracking/correction"""
+	"""
+	Decorator used to add the Beamline name used in the tracking/correction.
+
+	The label columns (`_SUMMARY_LABELS`) are stored as categoricals.
+	"""
 	@wraps(func)
 	def wrapper(self, *args, **kwargs):
 		res_dataframe = func(self, *args, **kwargs)
 		res_dataframe['beamline'] = self.beamline.name
+		for column in _SUMMARY_LABELS:
+			res_dataframe[column] = res_dataframe[column].astype("category")
 		return res_dataframe
 	return wrapper
 
@@ -163,6 +203,55 @@ def within_range(func):
 
 	return wrapper
 
+def cached_on_disk(func: Callable):
+	"""
+	Decorator caching the tracking and correction results on disk.
+
+	The cache is only used when `Machine` is created with the `cache_dir` option, the current 
+	beamline misalignments are used (`survey` is `None`), the callback does not save anything and 
+	the beam can be reproduced from its parameters (see [`Beam.parameters`][placetmachine.beam.beam.Beam]).
+	The key is the hash of the function name and its options, the beamline in Placet format (including 
+	the misalignments), the beam parameters, the cavities setup (see [`Machine.cavities_setup()`][placetmachine.machine.Machine.cavities_setup]) 
+	and the last seed set in Placet.
+	Passing `no_cache = True` bypasses the cache.
+
+	When the call changes the misalignments (eg. a correction), the new ones are saved next to the 
+	results and are read back into `Machine.beamline` when the results are taken from the cache.
+
+	When the results are taken from the cache, nothing is run in Placet. The state of Placet 
+	(eg. the positions of the elements) is then the one before the call, the misalignments 
+	in `Machine.beamline` are passed to Placet with the next call using them.
+
+	It is important that the decorated function has the following signature:
+	```
+	result = func(self, beam, survey, **kwargs)
+	```
+	"""
+	@wraps(func)
+	def wrapper(self, beam, survey = None, **kwargs):
+		no_cache = kwargs.pop('no_cache', False)
+		if no_cache or self._cache_dir is None or survey is not None or beam not in self.beams_invoked or \
+			beam.parameters is None or self._current_callback_key != self._callback_key(self.empty):
+			return func(self, beam, survey, **kwargs)
+
+		lattice = self.beamline.to_placet()
+		key = hashlib.blake2b(repr((func.__name__, sorted(kwargs.items()), lattice, beam.name, beam.beam_type, sorted(beam.parameters.items()), 
+			sorted(self._cavities_setup.items()), self.placet.errors_seed)).encode()).hexdigest()
+		filename, positions_file = os.path.join(self._cache_dir, f"{key}.pkl"), os.path.join(self._cache_dir, f"{key}.dat")
+		if os.path.exists(filename):
+			if os.path.exists(positions_file):
+				self.beamline.read_misalignments(positions_file, cav_bpm = 1, cav_grad_phas = 1)
+			return pd.read_pickle(filename)
+
+		res = func(self, beam, survey, **kwargs)
+		os.makedirs(self._cache_dir, exist_ok = True)
+		if self.beamline.to_placet() != lattice:
+			self.beamline.save_misalignments(positions_file, cav_bpm = True, cav_grad_phas = True)
+		res.to_pickle(filename)
+		return res
+
+	return wrapper
+
 class Machine():
 	"""
 	A class used for controling the beamline in **Placet**.
@@ -216,20 +305,49 @@ class Machine():
 			If `True` (default is `True`), prints the calculations progress in the console.
 		show_intro : bool
 			If `True` (default is `True`), prints the welcome message of Placet at the start.
-		"""
-		self.placet = Placet(save_logs = calc_options.get("save_logs", False), debug_mode = calc_options.get("debug_mode", False), 
+		cache_dir : Optional[str]
+			The folder to cache the tracking and correction results in (eg. `"~/.placet_cache"`). 
+			Default is `None` - no caching. This is the only results cache, see 
+			[`cached_on_disk()`][placetmachine.machine.cached_on_disk].
+		reuse_placet : bool
+			If `True` (default is `False`), takes an idle Placet process left by a closed `Machine` (see 
+			[`Machine.close()`][placetmachine.machine.Machine.close]) instead of starting a new one. 
+			The names of the beamlines and beams created in the reused process cannot be used again. 
+			The offsets, the survey errors, the procedures and the errors seed of the reused process are reset.
+		"""
+		placet_params = dict(save_logs = calc_options.get("save_logs", False), debug_mode = calc_options.get("debug_mode", False), 
 					   send_delay = calc_options.get("send_delay", None), show_intro = calc_options.get("show_intro", True))
+		self._reuse_placet = calc_options.get("reuse_placet", False)
+		if self._reuse_placet:
+			self.placet, used_names = acquire_placet(**placet_params)
+		else:
+			self.placet, used_names = Placet(**placet_params), None
+		self._placet_used_names = set() if used_names is None else used_names
 		self.console_output = calc_options.get("console_output", True)
 
-		#Sourcing the neccesarry scripts
-		dir_path = os.path.dirname(os.path.realpath(__file__))
+		if used_names is None:
+			#Sourcing the neccesarry scripts
+			dir_path = os.path.dirname(os.path.realpath(__file__))
 
-		self.placet.source(os.path.join(dir_path, "placet_files/clic_basic_single.tcl"), additional_lineskip = 2)
-		self.placet.source(os.path.join(dir_path, "placet_files/clic_beam.tcl"))
-		self.placet.source(os.path.join(dir_path, "placet_files/wake_calc.tcl"))
-		self.placet.source(os.path.join(dir_path, "placet_files/make_beam.tcl"))	#is optional
-		self.placet.declare_proc(self.empty)
+			self.placet.source(os.path.join(dir_path, "placet_files/clic_basic_single.tcl"), additional_lineskip = 2)
+			self.placet.source(os.path.join(dir_path, "placet_files/clic_beam.tcl"))
+			self.placet.source(os.path.join(dir_path, "placet_files/wake_calc.tcl"))
+			self.placet.source(os.path.join(dir_path, "placet_files/make_beam.tcl"))	#is optional
+			self.placet.declare_proc(self.empty)
+		else:
+			# the process is warm, the settings left by the previous `Machine` are reset
+			self.survey_errors_set()
+			self.placet.declare_proc(self.empty)
+			self.placet.declare_proc(self.empty, name = "callback")
+			self.placet.RandomReset(seed = random.randint(1, 1000000))
 		self.beamline, self.beams_invoked, self.beamlines_invoked = None, [], []
+		self._misalignments_synced = False
+		self._current_callback_key = None
+		self._cavities_setup = {}
+		self._track_dump_specs = {}
+		self._synced_lists = {}
+		self._rng = np.random.default_rng()
+		self._cache_dir = os.path.expanduser(calc_options['cache_dir']) if calc_options.get('cache_dir') is not None else None
 
 		#I/O setup
 		self.console = Console()
@@ -271,6 +389,17 @@ class Machine():
 		"""
 		self.placet.declare_proc(func, **dict(extra_params, name = "callback"))
 		self.callback_struct_ = (func, extra_params)
+		self._current_callback_key = self._callback_key(func, **extra_params)
+
+	@staticmethod
+	def _callback_key(func: Callable, **extra_params) -> tuple:
+		"""
+		Get the key identifying the callback setup.
+
+		Bound methods are created anew on each attribute access, so the underlying 
+		function is used to identify them.
+		"""
+		return (getattr(func, '__func__', func), tuple(sorted(extra_params.items())))
 
 	@term_logging
 	def create_beamline(self, lattice: str, **extra_params) -> Beamline:
@@ -314,10 +443,11 @@ class Machine():
 		_parser = extra_params.get('parser', "default")
 		if not _parser in Beamline._parsers:
 			raise ValueError(f"'parser' - incorrect value. Accepts {Beamline._parsers}, received - {_parser}")
-		if lattice_name in self.beamlines_invoked:
+		if lattice_name in self.beamlines_invoked or lattice_name in self._placet_used_names:
 			raise Exception(f"Beamline with the name '{lattice_name}' already exists.")
 
 		self.beamline = Beamline(lattice_name)		
+		self._synced_lists = {}
 		self.beamline.read_placet_lattice(lattice, debug_mode = extra_params.get('debug_mode', False), parser = _parser, parser_variables = extra_params.get('parser_variables', {}))
 		self.beamlines_invoked.append(lattice_name)
 
@@ -357,10 +487,11 @@ class Machine():
 		cavities_setup : dict
 			A dictionary containing the parameters for [`cavities_setup()`][placetmachine.machine.Machine.cavities_setup].
 		"""
-		if lattice.name in self.beamlines_invoked:
+		if lattice.name in self.beamlines_invoked or lattice.name in self._placet_used_names:
 			raise Exception(f"Beamline with the name '{lattice.name}' already exists.")
 
 		self.beamline = lattice
+		self._synced_lists = {}
 		self.beamlines_invoked.append(lattice.name)
 
 		self.placet.BeamlineNew()
@@ -429,10 +560,12 @@ class Machine():
 				self.console.log(f"[red] Warning! Machine.cavities_setup(): Parameter '{key}' is not given, using default value (0.0).")
 				
 		self.placet.set_list("structure", **structure_dict)
+		self._cavities_setup = dict(structure_dict, phase = extra_params.get('phase', 0.0), frac_lambda = extra_params.get('frac_lambda', 0.0), 
+			scale = extra_params.get('scale', 1.0))
 		#some go separately
-		self.placet.set("phase", extra_params.get('phase', 0.0))
-		self.placet.set("frac_lambda", extra_params.get('frac_lambda', 0.0))
-		self.placet.set("scale", extra_params.get('scale', 1.0))
+		self.placet.set("phase", extra_params.get('phase', 0.0), no_wait = True)
+		self.placet.set("frac_lambda", extra_params.get('frac_lambda', 0.0), no_wait = True)
+		self.placet.set("scale", extra_params.get('scale', 1.0), no_wait = True)
 
 	def survey_errors_set(self, **extra_params):
 		"""
@@ -455,10 +588,7 @@ class Machine():
 		Refer to [`Placet.SurveyErrorSet()`][placetmachine.placet.placetwrap.Placet.SurveyErrorSet] for more
 		details.
 		"""
-		errors_dict = {}
-		for error in self.placet.survey_erorrs:
-			errors_dict[error] = extra_params.get(error, 0.0)
-		self.placet.SurveyErrorSet(**errors_dict)
+		self.placet.SurveyErrorSet(**{error: extra_params.get(error, 0.0) for error in self.placet.survey_erorrs})
 
 	def assign_errors(self, survey: Optional[str] = None, **extra_params):
 		"""
@@ -601,9 +731,8 @@ class Machine():
 		"""
 		if self.beamlines_invoked == []:
 			raise Exception("No beamlines created, cannot create a beam. Create the beamline first")
-		for beam in self.beams_invoked:
-			if beam_name == beam.name:
-				raise ValueError(f"Beam with the name '{beam_name}' already exists! The beam you want to create should have a different name")	
+		if beam_name in self._placet_used_names or any(beam_name == beam.name for beam in self.beams_invoked):
+			raise ValueError(f"Beam with the name '{beam_name}' already exists! The beam you want to create should have a different name")	
 
 		particle_beam = Beam(beam_name, self.placet, "particle")
 		particle_beam.make_beam_many(n_slice, n, **extra_params)
@@ -668,9 +797,8 @@ class Machine():
 		"""
 		if self.beamlines_invoked == []:
 			raise Exception("No beamlines created, cannot create a beam. Create the beamline first")
-		for beam in self.beams_invoked:
-			if beam_name == beam.name:
-				raise ValueError(f"Beam with the name '{beam_name}' already exists! The beam you want to create should have a different name")	
+		if beam_name in self._placet_used_names or any(beam_name == beam.name for beam in self.beams_invoked):
+			raise ValueError(f"Beam with the name '{beam_name}' already exists! The beam you want to create should have a different name")	
 
 		sliced_beam = Beam(beam_name, self.placet, "sliced")
 		sliced_beam.make_beam_slice_energy_gradient(n_slice, n_macroparticles, eng, grad, beam_seed, **extra_params)
@@ -679,10 +807,16 @@ class Machine():
 
 		return sliced_beam
 
-	def _get_bpm_readings(self) -> pd.DataFrame:
+	def _get_bpm_readings(self, tracking: Optional[dict] = None) -> pd.DataFrame:
 		"""
 		Evaluate the BPMs reading and return them as a DataFrame.
 
+		Parameters
+		----------
+		tracking
+			If given, the parameters of the tracking run right before reading the BPMs, in the same line
+			(see [`Placet.run_tracking_with_readout()`][placetmachine.placet.placetwrap.Placet.run_tracking_with_readout]).
+
 		Returns
 		-------
 		DataFrame
@@ -690,18 +824,19 @@ class Machine():
 		"""
 		_tmp_filename = os.path.join(self._data_folder_, "bpm_readings.dat")
 		bpms = [element for element in self.beamline.extract(['Bpm'])]
-		self.placet.BpmReadings(file = _tmp_filename)
-		res = pd.DataFrame(columns = ['id', 's', 'x', 'y'])
-
-		i = 0
+		if tracking is None:
+			self.placet.BpmReadings(file = _tmp_filename)
+		else:
+			self.placet.run_tracking_with_readout(_tmp_filename, **tracking)
+		rows = []
 		with open(_tmp_filename, 'r') as f:
-			for line in f:
+			for bpm, line in zip(bpms, f):
 				tmp = list(map(lambda x: float(x), line.split()))
-				res = res.append(dict(id = bpms[i].index, s = bpms[i].settings['s'], x = tmp[1], y = tmp[2]), ignore_index = True)
-				i += 1
-		return res
+				rows.append(dict(id = bpm.index, s = bpm.settings['s'], x = tmp[1], y = tmp[2]))
+		return pd.DataFrame(rows, columns = ['id', 's', 'x', 'y'])
 
 	@add_beamline_to_final_dataframe
+	@cached_on_disk
 	@verify_survey
 	@verify_beam
 	def _track(self, beam: Beam, survey: str = None) -> pd.DataFrame:
@@ -709,7 +844,7 @@ class Machine():
 		return self.placet.TestNoCorrection(beam = beam.name, machines = 1, survey = survey, timeout = 100)
 
 	@term_logging
-	def track(self, beam: Beam, survey: Optional[str] = None) -> pd.DataFrame:
+	def track(self, beam: Beam, survey: Optional[str] = None, **extra_params) -> pd.DataFrame:
 		"""
 		Perform the tracking without applying any corrections.
 
@@ -752,6 +887,14 @@ class Machine():
 			- The rest value are Placet built-in surveys. After it is used, the alignment
 			in `self.beamline` is going to be updated with new values generated by a survey.
 
+		Other parameters
+		----------------
+		no_cache : bool
+			If `True` (default is `False`), the results cache is not used even if `Machine` was created with 
+			the `cache_dir` option. The cache is only used with the default `survey`, when the callback does 
+			not save the beam and for the sliced beams. On a cache hit the tracking is not run in Placet.
+			See [`cached_on_disk()`][placetmachine.machine.cached_on_disk].
+
 		Returns
 		-------
 		DataFrame
@@ -762,26 +905,35 @@ class Machine():
 			['correction', 'beam', 'beamline', 'survey', 'positions_file', 'emittx', 'emitty']
 			```
 		"""
-		return self._track(beam, survey)
+		return self._track(beam, survey, **_extract_dict(['no_cache'], extra_params))
 
 
 	@update_readings
-	def eval_orbit(self, beam: Beam) -> pd.DataFrame:
+	@verify_survey
+	@verify_beam
+	def eval_orbit(self, beam: Beam, survey: Optional[str] = None) -> pd.DataFrame:
 		"""
 		Evaluate the beam orbit based on the BPM readings.
 
+		The beam is tracked the same way as in [`Machine.track()`][placetmachine.machine.Machine.track],
+		but the results are never taken from the cache.
+
 		Parameters
 		----------
 		beam
 			The beam to use.
+		survey
+			The type of survey to be used. The accepted options are the same as for 
+			[`Machine.track()`][placetmachine.machine.Machine.track]. If `None` (**default**), 
+			the current beamline alignment from `self.beamline` is used.
 
 		Returns
 		-------
 		DataFrame
 			The orbit along the beamline.
 		"""
-		self._track(beam)
-		return self._get_bpm_readings()
+		# the tracking output is not used, so it is run along with the BPMs reading
+		return self._get_bpm_readings(dict(beam = beam.name, machines = 1, survey = survey, timeout = 100))
 
 	@term_logging
 	@verify_beam
@@ -835,38 +987,19 @@ class Machine():
 			_twiss_file = os.path.join(self._data_folder_, "twiss.dat")
 			self.placet.TwissPlotStep(**dict(extra_params, file = _twiss_file, beam = beam.name))
 			
-		res = pd.DataFrame(columns = ["id", "type", "s", "betx", "bety", 'alfx', 'alfy', 'Dx', 'Dy', 'E'])
-		
-		convert_line = lambda line: list(map(lambda x: float(x), line.split()))
-		_HEADER_LINES, line_id = 18, 0
-		twiss_current = 0.0, 0.0, {}
-		with open(_twiss_file, 'r') as f:
-			for line in f:
-				line_id += 1
-				if line_id <= _HEADER_LINES:
-					continue
+		raw = pd.read_csv(_twiss_file, sep = r'\s+', skiprows = _TWISS_HEADER_LINES, header = None, usecols = list(_TWISS_COLUMNS.values()), 
+			names = list(_TWISS_COLUMNS.keys()), dtype = np.float64, engine = 'c', memory_map = True)
+		ids = raw['id'].to_numpy(np.int64)
+		# id -> type mapping is static for the lattice, so building it once for all the rows
+		type_table = np.array([element.type for element in self.beamline.lattice], dtype = object)
 
-				data_list = convert_line(line)
-
-				twiss_current = {
-						"id": int(data_list[0]),
-						"type": self.beamline[int(data_list[0])].type,
-						"s": data_list[1],
-						"betx": data_list[5],
-						"bety": data_list[9],
-						"alfx": data_list[6],
-						"alfy": data_list[10],
-						"Dx": data_list[11],
-						"Dy": data_list[13],
-						"E": data_list[2]
-					}
+		res = pd.DataFrame({'id': ids, 'type': pd.Categorical(np.take(type_table, ids)), **{column: raw[column].to_numpy() for column in ["s", "betx", "bety", 'alfx', 'alfy', 'Dx', 'Dy', 'E']}})
 
-				res = res.append(twiss_current, ignore_index = True)
-		
 		return res	
 
 	@term_logging
 	@add_beamline_to_final_dataframe
+	@cached_on_disk
 	@update_misalignments
 	@verify_survey
 	@verify_beam
@@ -893,6 +1026,13 @@ class Machine():
 			- The rest value are Placet built-in surveys. After it is used, the alignment
 			in `self.beamline` is going to be updated with new values generated by a survey.
 		
+		Other parameters
+		----------------
+		no_cache : bool
+			If `True` (default is `False`), the results cache is not used even if `Machine` was created with 
+			the `cache_dir` option. On a cache hit the correction is not run in Placet, the corrected 
+			misalignments are read into `self.beamline`. See [`cached_on_disk()`][placetmachine.machine.cached_on_disk].
+
 		Other arguments accepted are inherited from 
 		[`Placet.TestSimpleCorrection()`][placetmachine.placet.placetwrap.Placet.TestSimpleCorrection],
 		except of `machines`, `survey`, and `beam`.
@@ -911,6 +1051,7 @@ class Machine():
 
 	@term_logging
 	@add_beamline_to_final_dataframe
+	@cached_on_disk
 	@update_misalignments
 	@verify_survey
 	@verify_beam
@@ -971,6 +1112,10 @@ class Machine():
 		bpms_realign : bool
 			If `True` (default is `True`), updates the reference orbit (bpm reading) by 
 			invoking a new callback procedure with `BpmRealign` in it.
+		no_cache : bool
+			If `True` (default is `False`), the results cache is not used even if `Machine` was created with 
+			the `cache_dir` option. On a cache hit the correction is not run in Placet, the corrected 
+			misalignments are read into `self.beamline`. See [`cached_on_disk()`][placetmachine.machine.cached_on_disk].
 
 		Other arguments accepted are inherited from 
 		[`Placet.TestMeasuredCorrection()`][placetmachine.placet.placetwrap.Placet.TestMeasuredCorrection],
@@ -1011,6 +1156,7 @@ class Machine():
 		self.placet.TestRfAlignment(**dict(extra_params, beam = beam.name, survey = survey, machines = 1))
 
 	@term_logging
+	@cached_on_disk
 	@verify_survey
 	@verify_beam
 	def RF_align(self, beam: Beam, survey: Optional[str] = None, **extra_params) -> pd.DataFrame:
@@ -1037,6 +1183,13 @@ class Machine():
 			- The rest value are Placet built-in surveys. After it is used, the alignment
 			in `self.beamline` is going to be updated with new values generated by a survey.
 		
+		Other parameters
+		----------------
+		no_cache : bool
+			If `True` (default is `False`), the results cache is not used even if `Machine` was created with 
+			the `cache_dir` option. On a cache hit the correction is not run in Placet, the corrected 
+			misalignments are read into `self.beamline`. See [`cached_on_disk()`][placetmachine.machine.cached_on_disk].
+
 		Other arguments accepted are inherited from 
 		[`Placet.TestRfAlignment()`][placetmachine.placet.placetwrap.Placet.TestRfAlignment],
 		except of `machines`, `survey`, and `beam`.
@@ -1055,7 +1208,7 @@ class Machine():
 		self.placet.Zero()
 		self._RF_align(beam, survey, **extra_params)
 		track_results = self._track(beam)
-		track_results.correction = "RF align"
+		track_results['correction'] = pd.Categorical(["RF align"] * len(track_results))
 		return track_results
 
 	def apply_knob(self, knob: Knob, amplitude: float, strategy: str, **extra_params):
@@ -1083,7 +1236,7 @@ class Machine():
 			If `True` (default) coordinates' changes are evaluated to also compensate the possible mismatches
 			caused by other knobs.
 		"""
-		if knob not in self.beamline.attached_knobs:
+		if id(knob) not in self.beamline._attached_knob_ids:
 			raise ValueError("The knob provided does not exist!")
 		knob.apply(amplitude, strategy = strategy, use_global_mismatch = extra_params.get("use_global_mismatch", True))
 
@@ -1162,39 +1315,24 @@ class Machine():
 
 		"""
 		beam_type = beam.beam_type
-		if not beam_type in ["sliced", "particle"]:
-			raise ValueError(f"'beam_type' incorrect value. Accepted values are ['sliced', 'particle']. Received '{beam_type}'")
-		_filename = os.path.join(self._data_folder_, "particles.dat")
-
-		callback_func, callback_params = self.callback_struct_
-
-		#sliced beam
-		if beam_type == "sliced":
-			if (callback_func.__name__ == self.save_sliced_beam.__name__) and (callback_params == dict(file = _filename)):
-				pass	#if the callback is there, no need to reset it
-			else:
-				self.set_callback(self.save_sliced_beam, file = _filename)
-		if beam_type == "particle":
-			if (callback_func.__name__ == self.save_beam.__name__) and (callback_params == dict(file = _filename)):
-				pass	#if the callback is there, no need to reset it
-			else:
-				self.set_callback(self.save_beam, file = _filename)				
+		if beam_type not in self._track_dump_specs:
+			if not beam_type in ["sliced", "particle"]:
+				raise ValueError(f"'beam_type' incorrect value. Accepted values are ['sliced', 'particle']. Received '{beam_type}'")
+			# the callback, its key and the file layout are fixed for a given beam type
+			_filename = os.path.join(self._data_folder_, "particles.dat")
+			callback = self.save_sliced_beam if beam_type == "sliced" else self.save_beam
+			self._track_dump_specs[beam_type] = (_filename, callback, self._callback_key(callback, file = _filename), _TRACK_COLUMNS[beam_type])
+		_filename, callback, callback_key, _columns = self._track_dump_specs[beam_type]
+
+		#if the callback is there, no need to reset it
+		if self._current_callback_key != callback_key:
+			self.set_callback(callback, file = _filename)
 		track_res = self.track(beam)
 		emitty, emittx = track_res.emitty[0], track_res.emittx[0]
 
 		# reading the file
-		_columns = []
-		if beam_type == 'sliced':
-			_columns = ['s', 'weight', 'E', 'x', 'px', 'y', 'py', 'sigma_xx', 'sigma_xpx', 'sigma_pxpx', 'sigma_yy', 'sigma_ypy', 'sigma_pypy', 'sigma_xy', 'sigma_xpy', 'sigma_yx', 'sigma_ypx']
-		if beam_type == 'particle':
-			_columns = ['E', 'x', 'y', 'z', 'px', 'py']
-
-		data_res, j = pd.DataFrame(columns = _columns), 0
-
-		for data in get_data(_filename):
-			data_tmp = pd.DataFrame({_columns[i]: data[i] for i in range(len(_columns))}, index = [j])
-			j += 1
-			data_res = pd.concat([data_res, data_tmp])
+		data_res = pd.DataFrame(np.concatenate(list(_iter_data_chunks(_filename, len(_columns)))), columns = _columns)
+
 		if not extra_params.get("keep_callback", False):
 			self.set_callback(self.empty)
 		return data_res, emittx, emitty
@@ -1253,18 +1391,18 @@ class Machine():
 			single_observable = True
 	
 		obs = []
-		if set(observables).issubset(set(['emittx', 'emitty'])):
+		if _EMIT_OBS.issuperset(observables):
 			#using the results of machine.track 
 			track_results = self.track(beam) if not extra_params.get('suppress_output', False) else self._track(beam)
 			obs = [float(track_results[observable].values) for observable in observables]
 		else:
 			#running machine.eval_track_results to identify the coordinates etc.
 			track_res, emittx, emitty = self.eval_track_results(beam)
-			for observable in observables:
-				if observable in ['emittx', 'emitty']:
-					obs.append(emitty if observable == 'emitty' else emittx)
-				else:
-					obs.append(list(track_res[observable].values))
+			# extracting all the coordinates with a single column selection
+			coord_obs = [observable for observable in observables if observable not in _EMIT_OBS]
+			coord_data = dict(zip(coord_obs, track_res.loc[:, coord_obs].to_numpy().T.tolist()))
+			emitt_data = {'emittx': emittx, 'emitty': emitty}
+			obs = [emitt_data[observable] if observable in _EMIT_OBS else coord_data[observable] for observable in observables]
 		
 		if single_observable:
 			return obs[0]
@@ -1325,6 +1463,10 @@ class Machine():
 			```
 			['simple_memory', 'min_scale_memory']
 			```
+		scan_log_file : str
+			If provided, each scan point is appended to this file as a JSON line 
+			`{"amplitude": .., "obs": ..}` as soon as it is evaluated. Useful to keep track 
+			of long scans.
 
 		Returns
 		------
@@ -1351,9 +1493,6 @@ class Machine():
 				and only 1 observable
 			`best_obs` is the fitted function.
 		"""
-		_obs_values = ['s', 'weight', 'E', 'x', 'px', 'y', 'py', 'sigma_xx', 'sigma_xpx', 
-				'sigma_pxpx', 'sigma_yy', 'sigma_ypy', 'sigma_pypy', 'sigma_xy', 'sigma_xpy', 
-				'sigma_yx', 'sigma_ypx', 'emittx', 'emitty']
 		_iteration_types = ["natural", "with_cache"]
 		if isinstance(observables, str):
 			observables = [observables]
@@ -1362,7 +1501,7 @@ class Machine():
 		if not knob_apply_strategy in knob._strategies_available:
 			raise ValueError(f"Strategy '{knob_apply_strategy}' is not available. Possible options are {knob._strategies_available}.")
 
-		if not set(list(observables)).issubset(set(_obs_values)):
+		if not _ALL_OBS.issuperset(observables):
 			raise ValueError(f"The observables(s) '{observables}' are not supported")
 
 		iteration_type = extra_params.get("iteration_type", "with_cache")
@@ -1400,27 +1539,10 @@ class Machine():
 			return amp, obs
 		
 		amplitudes_updated = []
-		if self.console_output:
-			table = console_table()	
-			
-			with Live(table, refresh_per_second = 10) as live:
-				amplitude_prev, obs = .0, None
-				for amplitude in knob_range:
-					if iteration_type == "with_cache":
-						amp, obs = _eval_obs(knob, amplitude, iteration_type, knob_apply_strategy)
-					elif iteration_type == "natural":
-						amp, obs = _eval_obs(knob, amplitude - amplitude_prev, iteration_type, knob_apply_strategy)
-						amplitude_prev = amplitude
-					else:
-						continue
-					observable_values.append(obs)
-					amplitudes_updated.append(amp)
-					if knob_apply_strategy in ['min_scale', 'min_scale_memory']:
-						table.add_row(str(amplitude), str(amp), *list(map(lambda x: str(x), obs)))
-					else:
-						table.add_row(str(amp), *list(map(lambda x: str(x), obs)))
-				live.refresh()
-		else:
+		table = console_table() if self.console_output else None
+		scan_log_file = extra_params.get("scan_log_file", None)
+		with Live(table, refresh_per_second = 10) if self.console_output else nullcontext() as live, \
+			open(scan_log_file, 'a') if scan_log_file is not None else nullcontext() as scan_log:
 			amplitude_prev, obs = .0, None
 			for amplitude in knob_range:
 				if iteration_type == "with_cache":
@@ -1432,6 +1554,17 @@ class Machine():
 					continue
 				observable_values.append(obs)
 				amplitudes_updated.append(amp)
+				if scan_log is not None:
+					scan_log.write(_dumps({'amplitude': amp, 'obs': obs}) + "\n")
+					scan_log.flush()
+				if not self.console_output:
+					continue
+				if knob_apply_strategy in ['min_scale', 'min_scale_memory']:
+					table.add_row(str(amplitude), str(amp), *list(map(lambda x: str(x), obs)))
+				else:
+					table.add_row(str(amp), *list(map(lambda x: str(x), obs)))
+			if self.console_output:
+				live.refresh()
 		
 		# if we iterated using the "natural" iteration type, we need to reset the knob
 		# back since currently the knob amplitude is equal to `knob_range[-1]`
@@ -1603,8 +1736,10 @@ class Machine():
 		strength_error
 			Standard relative deviation of the quadrupole strength.
 		"""
-		for quad in self.beamline.extract(['Quadrupole']):
-			quad.settings['strength'] += quad.settings['strength'] * random.gauss(0, strength_error)
+		quads = self.beamline._get_elements_of_type('Quadrupole')
+		samples = self._rng.normal(0.0, strength_error, size = len(quads))
+		for quad, sample in zip(quads, samples):
+			quad.settings['strength'] += quad.settings['strength'] * sample
 
 		self._update_quads_strengths()	
 
@@ -1619,12 +1754,14 @@ class Machine():
 		grad_error
 			Standard deviation of the gradient (Absolue value).
 		"""
-		for cav in self.beamline.extract(['Cavity']):
-			cav.settings['phase'] += random.gauss(0, phase_error)
-			cav.settings['gradient'] += random.gauss(0, grad_error)
+		cavs = self.beamline._get_elements_of_type('Cavity')
+		phase_samples = self._rng.normal(0.0, phase_error, size = len(cavs))
+		grad_samples = self._rng.normal(0.0, grad_error, size = len(cavs))
+		for cav, phase_sample, grad_sample in zip(cavs, phase_samples, grad_samples):
+			cav.settings['phase'] += phase_sample
+			cav.settings['gradient'] += grad_sample
 
-		self._update_cavs_phases()
-		self._update_cavs_gradients()
+		self._sync_element_lists(cav_phases = self.beamline._get_cavs_phases(), cav_gradients = self.beamline._get_cavs_gradients())
 
 	def misalign_element(self, **extra_params):
 		"""
@@ -1888,23 +2025,71 @@ class Machine():
 
 		self.placet.SaveAllPositions(**_extract_dict(_options_list, extra_params), file = _tmp_file)
 		self.beamline.read_misalignments(_tmp_file, **_extract_dict(_options_list, extra_params))
+		self._misalignments_synced = True
+
+	def _sync_element_lists(self, **values_lists):
+		"""
+		Set the given lists of values in Placet, skipping the ones Placet already has.
+
+		The values last sent to Placet are memorized for the current `self.beamline`. 
+		Runs [`Placet.set_element_lists()`][placetmachine.placet.placetwrap.Placet.set_element_lists]
+		for the lists that changed.
+
+		Other parameters
+		----------------
+		quad_strengths : List[float]
+			The list with the quadrupoles strengths.
+		cav_gradients : List[float]
+			The list with the cavities gradients.
+		cav_phases : List[float]
+			The list with the cavities phases.
+		"""
+		beamline_state = (self.beamline, self.beamline._topology_version)
+		changed_lists = {}
+		for key, values in values_lists.items():
+			values = tuple(values)
+			if self._synced_lists.get(key) != (beamline_state, values):
+				changed_lists[key] = values
+
+		if changed_lists == {}:
+			return
+		self.placet.set_element_lists(**{key: list(values) for key, values in changed_lists.items()})
+		for key, values in changed_lists.items():
+			self._synced_lists[key] = (beamline_state, values)
 
 	def _update_quads_strengths(self, **extra_params):
 		"""Synchronize the quads strength in self.beamline with Placet"""
-		self.placet.QuadrupoleSetStrengthList(self.beamline._get_quads_strengths())
+		self._sync_element_lists(quad_strengths = self.beamline._get_quads_strengths())
 
 	def _update_cavs_phases(self, **extra_params):
 		"""Synchronize the cavs phase in self.beamline with Placet"""
-		self.placet.CavitySetPhaseList(self.beamline._get_quads_strengths())
+		self._sync_element_lists(cav_phases = self.beamline._get_cavs_phases())
 
 	def _update_cavs_gradients(self, **extra_params):
-		"""Synchronize the cavs phase in self.beamline with Placet"""
-		self.placet.CavitySetGradientList(self.beamline._get_quads_strengths())
+		"""Synchronize the cavs gradient in self.beamline with Placet"""
+		self._sync_element_lists(cav_gradients = self.beamline._get_cavs_gradients())
 
 	def random_reset(self, seed: Optional[int] = None):
 		"""
 		Reset the random seed in Placet.
 
 		Runs [`Placet.RandomReset()`][placetmachine.placet.placetwrap.Placet.RandomReset].
+		When `seed` is given, the generator used for the quadrupoles' and cavities' errors 
+		is reseeded as well.
 		"""
 		self.placet.RandomReset(seed = seed if seed is not None else random.randint(1, 1000000))
+		if seed is not None:
+			self._rng = np.random.default_rng(seed)
+
+	def close(self):
+		"""
+		Close the Placet process of the `Machine`.
+
+		When the `Machine` was created with `reuse_placet = True`, the process is not terminated but 
+		released to the pool of the idle ones (see [`acquire_placet()`][placetmachine.placet.placetwrap.acquire_placet]), 
+		so the next `Machine` created with `reuse_placet = True` does not have to start Placet again.
+		"""
+		if self._reuse_placet:
+			release_placet(self.placet, self._placet_used_names | set(self.beamlines_invoked) | {beam.name for beam in self.beams_invoked})
+		else:
+			self.placet.close()
@@ -10,4 +10,4 @@
 
 from placetmachine.placet.communicator import Communicator
 from placetmachine.placet.pyplacet import Placetpy, PlacetCommand
-from placetmachine.placet.placetwrap import Placet
\ No newline at end of file
+from placetmachine.placet.placetwrap import Placet, MissingPlacetParam, acquire_placet, release_placet
\ No newline at end of file
@@ -1,7 +1,10 @@
 from functools import wraps
 from abc import ABC, abstractmethod
-import pandas as pd
-from typing import Callable, List
+from typing import Callable, List, Optional
+from collections import deque
+import atexit
+import os
+import time
 import pexpect
 
 
@@ -12,13 +15,20 @@ def alive_check(func: Callable) -> Callable:
 	Used with [`writeline()`][placetmachine.placet.communicator.Communicator.writeline], 
 	[`readline()`][placetmachine.placet.communicator.Communicator.readline], and 
 	[`readlines()`][placetmachine.placet.communicator.Communicator.readlines].
+
+	Checking the process state (`waitpid`) on each call is costly, so it is only done once
+	pexpect has reported the end of file, either before the call or with an exception in it.
 	"""
 	@wraps(func)
 	def wrapper(self, *args, **kwargs):
-		if self.isalive():
-			return func(self, *args, **kwargs)
-		else:
+		if self.process.flag_eof and not self.isalive():
 			raise Exception(f"The process is dead. Restart it before running '{func.__name__}'.")
+		try:
+			return func(self, *args, **kwargs)
+		except pexpect.EOF as err:
+			if not self.isalive():
+				raise Exception(f"The process is dead. Restart it before running '{func.__name__}'.") from err
+			raise
 	
 	return wrapper
 
@@ -28,19 +38,42 @@ def logging(func: Callable) -> Callable:
 	[`readline()`][placetmachine.placet.communicator.Communicator.readline], and 
 	[`readlines()`][placetmachine.placet.communicator.Communicator.readlines].
 	"""
+	name = func.__name__
 	@wraps(func)
 	def wrapper(self, *args, **kwargs):
-		if self.debug_mode:
-			exec_summ = dict(function = func.__name__, arguments = [args, kwargs])
-			self.debug_data = self.debug_data.append(exec_summ, ignore_index = True)
-			print(f"\t{exec_summ}")
-
-		res = func(self, *args, **kwargs)
+		if not self._debug_mode:
+			return func(self, *args, **kwargs)
 
-		return res
+		exec_summ = dict(function = name, arguments = [args, kwargs])
+		self._debug_rows.append(exec_summ)
+		print(f"\t{exec_summ}")
+		return func(self, *args, **kwargs)
 
 	return wrapper
 
+class _LogFile:
+	"""
+	File-like object used for the logs of the child process.
+
+	pexpect flushes the log after each write, so the data is encoded and written to a 
+	binary file with a large buffer and the flush requests are ignored. The file is closed 
+	(and the buffer written) when the logs are switched off or at the interpreter exit.
+	"""
+	def __init__(self, filename: str, buffering: int = 65536):
+		self._file = open(filename, "wb", buffering = buffering)
+		atexit.register(self.close)
+
+	def write(self, data: str):
+		self._file.write(data.encode('utf-8'))
+
+	def flush(self):
+		pass
+
+	def close(self):
+		if not self._file.closed:
+			self._file.close()
+			atexit.unregister(self.close)
+
 class Communicator(ABC):
 	"""
 	A class used to interact with the process spawned with [`Pexpect`](https://github.com/pexpect/pexpect).
@@ -55,10 +88,15 @@ class Communicator(ABC):
 	"""
 	_BASE_TIMEOUT = 100
 	_BUFFER_MAXSIZE = 1000
-	_DELAY_BEFORE_SEND = 0.1
+	_DELAY_BEFORE_SEND = 0.0
+	_FALLBACK_DELAY_BEFORE_SEND = 0.1
 	_TERMINAL_SPECIAL_SYMBOL = "% "
+	_MAX_READ = 32768
+	_LOG_BUFFER_SIZE = 65536
+	_WRITE_CHUNK_SIZE = 4096
+	_DEBUG_COLUMNS = ['function', 'arguments', 'run_time', "res"]
+	_DEBUG_MAXSIZE = 100000
 
-	__expect_block = False
 	def __init__(self, process_name: str, **kwargs):
 		"""
 		Parameters
@@ -74,16 +112,33 @@ class Communicator(ABC):
 			If `True` (default is `True`) , invoking [`save_debug_info()`][placetmachine.placet.communicator.Communicator.save_debug_info].
 		send_delay : float
 			The time delay before each data transfer to a child process (sometimes needed for stability).
-			Default is `Communicator._BUFFER_MAXSIZE`.
+			Default is `Communicator._DELAY_BEFORE_SEND` (no delay). When no delay is set and writing to 
+			the process fails, the delay is switched to `Communicator._FALLBACK_DELAY_BEFORE_SEND`.
+		echo : bool
+			If `False` (default is `True`), the child process is started with the terminal echo switched off.
+			The commands sent are then not read back, so `skipline` in 
+			[`writeline()`][placetmachine.placet.communicator.Communicator.writeline] has no effect. 
+			Only works for the processes that do not echo the input themselves (eg. with readline).
+		debug_max : int
+			The maximum number of the records kept in debug mode. When it is reached, the oldest 
+			records are dropped. Default is `Communicator._DEBUG_MAXSIZE`.
 		"""
 		self._debug_mode = kwargs.get('debug_mode', False)
+		self._debug_max = kwargs.get('debug_max', self._DEBUG_MAXSIZE)
 		self._process_name = process_name
 		self._save_logs = kwargs.get("save_logs", True)
 		self._send_delay = kwargs.get('send_delay', self._DELAY_BEFORE_SEND)
+		self._echo = kwargs.get('echo', True)
+		# the debug records, filled only in debug mode (see `debug_data`)
+		self._debug_rows = deque(maxlen = self._debug_max)
 		self.__init()
 
 	def __init(self):
-		self.process = pexpect.spawnu(self._process_name, timeout = None, encoding = 'utf-8')
+		self.process = pexpect.spawnu(self._process_name, timeout = None, encoding = 'utf-8', maxread = self._MAX_READ, echo = self._echo)
+		# no pause after each read in `expect` calls, the reads are waiting for the data anyway
+		self.process.delayafterread = None
+		# `True` when the prompt printed after the last command has not been consumed yet
+		self._prompt_pending = True
 
 		self.__debug_init()
 
@@ -94,18 +149,23 @@ class Communicator(ABC):
 	def __debug_init(self):
 		if self.debug_mode:
 			print(f"Debug mode is on. Running the process '{self._process_name}', debug_mode = {self.debug_mode}, save_logs = {self._save_logs}, send_delay = {self._send_delay}")
-			self.debug_data = pd.DataFrame(columns = ['function', 'arguments', 'run_time', "res"])
+			self._debug_rows = deque(maxlen = self._debug_max)
 
 	def __save_logs(self):
 		"""
 		Open the files to store the log data of a child process
 
 		By default, the names are "log_send.txt" for logfile_send and "log_read.txt" for logfile_read.
+		The files are written with a buffer of `Communicator._LOG_BUFFER_SIZE` bytes.
 		"""
+		for logfile in getattr(self, '_log_files', []):
+			logfile.close()
+		self._log_files = []
+
 		if self.save_logs:
 			print(f"Saving the log files. Default send file is 'log_send.txt', default read file is 'log_read.txt'.")
-			self.process.logfile_send = open("log_send.txt", "w")
-			self.process.logfile_read = open("log_read.txt", "w")
+			self._log_files = [_LogFile("log_send.txt", self._LOG_BUFFER_SIZE), _LogFile("log_read.txt", self._LOG_BUFFER_SIZE)]
+			self.process.logfile_send, self.process.logfile_read = self._log_files
 		else:
 			self.process.logfile_send = None
 			self.process.logfile_read = None
@@ -125,6 +185,17 @@ class Communicator(ABC):
 			print("Debug mode is switched off")
 			self._debug_mode = value
 	
+	@property
+	def debug_data(self):
+		"""
+		The records collected in debug mode, as a `DataFrame`.
+
+		The last `debug_max` records are stored and the `DataFrame` is built on access.
+		"""
+		# pandas is only needed here, so it is not imported with the module
+		import pandas as pd
+		return pd.DataFrame(self._debug_rows, columns = self._DEBUG_COLUMNS)
+
 	@property
 	def save_logs(self) -> bool:
 		return self._save_logs
@@ -156,9 +227,10 @@ class Communicator(ABC):
 		Parameters
 		----------
 		time
-			The time delay.
+			The time delay. `0` disables the delay.
 		"""
-		self.process.delaybeforesend = time
+		self._send_delay = time
+		self.process.delaybeforesend = time or None
 
 	@logging
 	@alive_check
@@ -174,8 +246,8 @@ class Communicator(ABC):
 		in between writing the command.
 		There has to be always 1 `expect` call after command execution. By default, one `expect` call is used before
 		writing the command. In certain situations, one would want to do the `expect` call after the command is written.
-		The parameter `__expect_block` controls the use of `expect` commands - making sure, only 1 expect command is 
-		executed in between 2 commands.
+		The attribute `_prompt_pending` tracks whether the prompt after the previous command is still to be consumed - 
+		making sure, only 1 expect command is executed in between 2 commands.
 
 		Parameters
 		----------
@@ -184,7 +256,7 @@ class Communicator(ABC):
 		skipline
 			If True, reads the command that was sent to a child process from child's process output
 			This flag depends on the default running mode of pexpect. By default, it outputs to stdout what was just
-			send to stdin
+			send to stdin. Has no effect when the process is running with `echo = False`.
 		timeout
 			Timeout of the reader before raising the exception.
 			*[30.11.2022] - No effect anymore. The parameter is kept for compatibility.*
@@ -196,7 +268,7 @@ class Communicator(ABC):
 		expect_after : bool
 			If `True` (default is `False`), `expect` is invoked after writing the command.
 		no_expect : bool
-			If `True` (default is `False`), no `expect` is invoked, ignoring `__expect_block`
+			If `True` (default is `False`), no `expect` is invoked, ignoring `_prompt_pending`
 
 		Returns
 		-------
@@ -204,22 +276,91 @@ class Communicator(ABC):
 			The command that was sent to a child process
 		"""
 		no_expect = kwargs.get('no_expect', False)
-		if kwargs.get('expect_before', True) and not self.__expect_block and not no_expect:
-			self.process.expect(self._TERMINAL_SPECIAL_SYMBOL, timeout = self._BASE_TIMEOUT)
+		if kwargs.get('expect_before', True) and self._prompt_pending and not no_expect:
+			self._expect_prompt()
 
-		self.flush()
+		self._raw_write(command)
 
-		self.process.write(command)
-
-		if skipline: self.skipline(timeout)
-		self.__expect_block = False
+		# without the terminal echo there is no command to read back
+		if skipline and self._echo: self.skipline(timeout)
+		self._prompt_pending = True
 
 		if kwargs.get('expect_after', False) and not no_expect:
-			self.process.expect(self._TERMINAL_SPECIAL_SYMBOL, timeout = self._BASE_TIMEOUT)
-			self.__expect_block = True
+			self._expect_prompt()
+			self._prompt_pending = False
 
 		return command
 
+	def writelines(self, commands: List[str], skipline: bool = True, timeout: float = _BASE_TIMEOUT, **kwargs) -> str:
+		"""
+		Send several commands to a child process in a single line.
+
+		The commands are joined with `'; '` and passed to 
+		[`writeline()`][placetmachine.placet.communicator.Communicator.writeline], so there is only 
+		one prompt `expect` call and one echoed line for the whole batch.
+
+		Parameters
+		----------
+		commands
+			The commands to execute.
+		skipline
+			If True, reads the line that was sent to a child process from child's process output.
+		timeout
+			Timeout of the reader before raising the exception.
+			*No effect anymore. The parameter is kept for compatibility.*
+
+		Other parameters accepted are the same as for [`writeline()`][placetmachine.placet.communicator.Communicator.writeline].
+
+		Returns
+		-------
+		str
+			The line that was sent to a child process.
+		"""
+		return self.writeline("; ".join(map(lambda x: x.rstrip("\n"), commands)) + "\n", skipline, timeout, **kwargs)
+
+	def _raw_write(self, data: str):
+		"""
+		Write the data to the child process.
+
+		Does the same as `process.send()` (the delay before sending, logging and encoding), but writes 
+		the data to the pty in chunks of `Communicator._WRITE_CHUNK_SIZE` bytes, making sure 
+		all of it is written even if `os.write()` accepts only a part of it.
+
+		When no send delay is set and a write fails, the delay is switched to 
+		`Communicator._FALLBACK_DELAY_BEFORE_SEND` and the failed chunk is written again once.
+		"""
+		process = self.process
+		if process.delaybeforesend is not None:
+			time.sleep(process.delaybeforesend)
+		if process.logfile_send is not None:
+			process.logfile_send.write(data)
+			process.logfile_send.flush()
+
+		view = memoryview(data.encode(process.encoding))
+		offset = 0
+		while offset < len(view):
+			chunk = view[offset:offset + self._WRITE_CHUNK_SIZE]
+			try:
+				offset += os.write(process.child_fd, chunk)
+			except OSError:
+				if self._send_delay:
+					raise
+				# running without the delay might be unstable, falling back to the safe delay
+				self.add_send_delay(self._FALLBACK_DELAY_BEFORE_SEND)
+				time.sleep(self._send_delay)
+				offset += os.write(process.child_fd, chunk)
+
+	def _expect_prompt(self, timeout: float = _BASE_TIMEOUT):
+		"""
+		Wait for the prompt defined in `Communicator._TERMINAL_SPECIAL_SYMBOL`.
+
+		Raises `pexpect.TIMEOUT` if the prompt is not received within `timeout` seconds.
+
+		The prompt is a fixed string, so it is searched with `process.expect_exact()` instead of 
+		the regex search of `process.expect()`. The output preceding the prompt is stored in `process.before`.
+		"""
+		self.process.expect_exact(self._TERMINAL_SPECIAL_SYMBOL, timeout = timeout)
+
 	def isalive(self) -> bool:
 		return self.process.isalive()
 
@@ -280,14 +421,18 @@ class Communicator(ABC):
 
 	@logging
 	@alive_check
-	def readlines(self, N_lines: int, timeout: float = _BASE_TIMEOUT) -> List[str]:
+	def readlines(self, N_lines: Optional[int] = None, timeout: float = _BASE_TIMEOUT) -> List[str]:
 		"""
 		Read several lines from the child process.
+
+		When `N_lines` is not given, reads everything up to the next prompt with a single `expect` call.
+		The prompt is consumed, so the next [`writeline()`][placetmachine.placet.communicator.Communicator.writeline]
+		does not wait for it again.
 		
 		Parameters
 		----------
 		N_lines
-			Number of lines to read.
+			Number of lines to read. If `None` (default), reads all the lines up to the prompt.
 		timeout
 			Timeout of the reader before raising the exception.
 			[30.11.2022] - No effect anymore. The parameter is kept for compatibility.
@@ -297,18 +442,42 @@ class Communicator(ABC):
 		list
 			The list of the lines received from the child process.
 		"""
-		res = []
-		for i in range(N_lines):
-			res.append(self._readline(timeout))
-		return res
+		if N_lines is None:
+			# the pty ends the lines with '\r\r\n', which `splitlines()` takes for 2 line breaks
+			return self.read_until_prompt().replace("\r\r\n", "\r\n").splitlines(keepends = True)
+
+		return [self.process.readline() for i in range(N_lines)]
+
+	@alive_check
+	def read_until_prompt(self) -> str:
+		"""
+		Read all the output of the child process up to the next prompt.
+
+		The output is read with a single `expect` call and the prompt is consumed, so the next 
+		[`writeline()`][placetmachine.placet.communicator.Communicator.writeline] does not wait for it again.
+
+		Returns
+		-------
+		str
+			The data received from the child process before the prompt.
+		"""
+		self._expect_prompt()
+		self._prompt_pending = False
+		return self.process.before
 
 	def flush(self):
-		"""Flush the child process buffer"""
+		"""
+		Flush the child process buffer.
+
+		Not used when writing the commands (the prompt is already synchronized by then), kept for diagnostics.
+		"""
 		self.process.flush()
 
 	def save_debug_info(self, filename: str = "debug_data.pkl"):
 		"""
 		Save the debug info to a files.
+
+		The records collected in debug mode are converted to a `DataFrame` and pickled.
 		
 		Parameters
 		----------
@@ -319,7 +488,7 @@ class Communicator(ABC):
 			self.debug_data.to_pickle(filename)
 
 	def __repr__(self):
-		return f"Communicator('{self._process_name}', debug_mode = {self.debug_mode}, save_logs = {self._save_logs}, send_delay = {self._send_delay})"
+		return f"Communicator('{self._process_name}', debug_mode = {self.debug_mode}, save_logs = {self._save_logs}, send_delay = {self._send_delay}, echo = {self._echo})"
 
 	def __str__(self):
 		return f"Communicator(process_name = '{self._process_name}', is_alive = {self.isalive()})"
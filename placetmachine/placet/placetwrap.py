@@ -1,17 +1,160 @@
-from functools import wraps
-from time import sleep, time
+from contextlib import contextmanager
+from functools import wraps, lru_cache
+from time import sleep, perf_counter
 from typing import Callable, List, Optional
+import logging as _logging
+import os
+import re
 import pandas as pd
+import numpy as np
 from placetmachine.placet import Placetpy, PlacetCommand
 
 
-_extract_subset = lambda _set, _dict: list(filter(lambda key: key in _dict, _set))
-_extract_dict = lambda _set, _dict: {key: _dict[key] for key in _extract_subset(_set, _dict)}
+_log = _logging.getLogger(__name__)
+
+_extract_subset = lambda _set, _dict: [key for key in _set if key in _dict]
+_extract_dict = lambda _set, _dict: {key: _dict[key] for key in _set if key in _dict}
+
+class MissingPlacetParam(KeyError):
+	"""Raised when the parameter required by a **Placet** command is not given."""
+	def __str__(self):
+		return self.args[0]
+
+def _require(command_details: dict, param: str):
+	"""
+	Check that the required parameter is in `command_details`.
+
+	Raises `MissingPlacetParam` if it is not.
+	"""
+	try:
+		command_details[param]
+	except KeyError:
+		raise MissingPlacetParam(f"'{param}' parameter is missing") from None
+
+# options accepted by the Placet commands
+_TWISSPLOTSTEP_OPTS = ('file', 'beam', 'step', 'start', 'end', 'list')
+_TESTNOCORRECTION_OPTS = ('machines', 'beam', 'survey', 'emitt_file', 'bpm_res', 'format')
+_TESTSIMPLECORRECTION_OPTS = ('machines', 'start', 'end', 'interleave', 'binlength', 'binoverlap', 'jitter_x', 'jitter_y', 'bpm_resolution', 'beam', 'testbeam',
+	'survey', 'emitt_file', 'bin_list', 'bin_file_out', 'bin_file_in', 'correctors')
+_TESTFREECORRECTION_OPTS = ('machines', 'binlength', 'binoverlap', 'jitter_y', 'jitter_x', 'bpm_resolution', "rf_align", 'beam', 'survey', 'emitt_file', 'wgt0', 'wgt1', 'pwgt', 
+	'quad_set0', 'quad_set1', 'quad_set2', 'load_bins', 'save_bins')
+_TESTMEASUREDCORRECTION_OPTS = ('machines', 'start', 'end', 'binlength', 'correct_full_bin', 'binoverlap', 'jitter_x', 'jitter_y', 'bpm_resolution', 'rf_align',
+	'no_acc', 'beam0', 'beam1', 'beam2', 'cbeam0', 'cbeam1', 'cbeam2', 'gradient1', 'gradient2', 'survey', 'emitt_file', 'wgt0', 'wgt1', 'wgt2', 'pwgt', 'quad_set0', 
+	'quad_set1', 'quad_set2', 'load_bins', 'save_bins', 'gradient_list0', 'gradient_list1', 'gradient_list2', 'bin_iterations', 'beamline_iterations', 'correctors')
+_TESTRFALIGNMENT_OPTS = ('beam', 'testbeam', 'machines', 'binlength', 'wgt0', 'wgt1', 'pwgt', 'girder', 'bpm_resolution', 'survey', 'emitt_file')
+_WRITEGIRDERLENGTH_OPTS = ('file', 'binary', 'beginning_only', 'absolute_position')
+_SURVEYERRORSET_OPTS = ('quadrupole_x', 'quadrupole_y', 'quadrupole_xp', 'quadrupole_yp', 'quadrupole_roll', 'cavity_x', 'cavity_realign_x', 'cavity_y',
+	'cavity_realign_y', 'cavity_xp', 'cavity_yp', 'cavity_dipole_x', 'cavity_dipole_y', 'piece_x', 'piece_xp', 'piece_y', 'piece_yp', 'bpm_x', 'bpm_y', 'bpm_xp', 'bpm_yp',
+	'bpm_roll', 'sbend_x', 'sbend_y', 'sbend_xp', 'sbend_yp', 'sbend_roll')
+_CLIC_OPTS = ('start', 'end')
+_SAVEALLPOSITIONS_OPTS = ('file', 'binary', 'nodrift', 'vertical_only', 'positions_only', 'cav_bpm', 'cav_grad_phas')
+_READALLPOSITIONS_OPTS = ('file', 'binary', 'nodrift', 'nomultipole', 'vertical_only', 'positions_only', 'cav_bpm', 'cav_grad_phas')
+_INTERGIRDERMOVE_OPTS = ('scatter_x', 'scatter_y', 'flo_x', 'flo_y', 'cav_only')
+_RANDOMRESET_OPTS = ('seed',)
+_INJECTORBEAM_OPTS = ('macroparticles', 'silent', 'energyspread', 'ecut', 'energy_distribution', 'file', 'bunches', 'chargelist', 'slices', 'e0', 'charge', 'particles',
+	'last_wgt', 'distance', 'overlapp', 'phase', 'wake_scale_t', 'wake_scale_l', 'beta_x', 'alpha_x', 'emitt_x', 'beta_y', 'alpha_y', 'emitt_y', 'beamload')
+_BEAMREAD_OPTS = ('file', 'binary', 'binary_stream', 'beam')
+_BEAMSAVEALL_OPTS = ('file', 'beam', 'header', 'axis', 'binary', 'bunches')
+_BEAMDUMP_OPTS = ('file', 'beam', 'xaxis', 'yaxis', 'binary', 'binary_stream', 'losses', 'seed', 'type', 'rotate_x', 'rotate_y')
+_GETTRANSFERMATRIX_OPTS = ('beamline', 'start', 'end')
+_BEAMSETTOOFFSET_OPTS = ('beam', 'x', 'y', 'angle_x', 'angle_y', 'start', 'end')
+_ELEMENTSETTOOFFSET_OPTS = ('x', 'y', 'xp', 'yp', 'roll', 'angle_x', 'angle_y')
+_ELEMENTADDOFFSET_OPTS = ('x', 'y', 'xp', 'yp', 'roll', 'angle_x', 'angle_y')
+_MOVEGIRDER_OPTS = ('file', 'vertical_only', 'binary', 'scale')
+_BPMREALIGN_OPTS = ('error_x', 'error_y', 'bunch')
+_BEAMADDOFFSET_OPTS = ('beam', 'x', 'y', 'angle_x', 'angle_y', 'rotate', 'start', 'end')
+_ELEMENTSETATTRIBUTES_OPTS = (
+	# quadrupoles
+	'name', 's', 'x', 'y', 'xp', 'yp', 'roll', 'length', 'synrad', 'six_dim', 'thin_lens', 'e0', 'aperture_x', 'aperture_y', 'aperture_losses', 'aperture_shape',
+	'strength', 'tilt', 'hcorrector', 'hcorrector_step_size', 'vcorrector', 'vcorrector_step_size',
+	# sbends
+	'angle', 'E1', 'E2', 'K', 'K2',
+	# BPMs
+	'resolution', 'reading_x', 'reading_y', 'scale_x', 'scale_y', 'store_bunches',
+	# cavities
+	'gradient', 'phase', 'type', 'lambda', 'frequency',
+	# dipoles
+	'strength_x', 'strength_y',
+	# multipoles
+	'steps'
+)
+
+# the number of the options templates stored per list of parameters
+_TEMPLATES_MAXSIZE = 64
+
+@lru_cache(maxsize = 256)
+def _command_builder(param_list: tuple) -> Callable:
+	"""
+	Create the function generating the options of the command for Placet with the given list of parameters.
+
+	For each set of the given parameters, a format string (eg. `" -machines {machines} -beam {beam}"`) 
+	is generated once and stored, so generating the options is a single `str.format_map()` call. 
+	The templates do not depend on the command name, so they are shared between the commands 
+	with the same parameters (eg. `ElementSetAttributes` for different elements).
+	"""
+	param_set = frozenset(param_list)
+	order = {key: i for i, key in enumerate(param_list)}
+	templates = {}
+
+	def build(command_details: dict) -> str:
+		keys = tuple(command_details)
+		template = templates.get(keys)
+		if template is None:
+			if len(templates) >= _TEMPLATES_MAXSIZE:
+				templates.clear()
+			# filtering the given parameters, keeping the order of `param_list`
+			used = sorted(param_set.intersection(keys), key = order.__getitem__)
+			template = templates[keys] = "".join([f" -{key} {{{key}}}" for key in used])
+		return template.format_map(command_details)
+	return build
+
+def _parse_numbers(text: str, dtype: type) -> list:
+	"""Parse the whitespace separated numbers into a list (the parsing is done by numpy)."""
+	text = text.strip()
+	# numpy parses a whitespace only string as a single 0
+	return np.fromstring(text, dtype = dtype, sep = " ").tolist() if text else []
+
+# a row of a Tcl list of lists, eg. "{1.0 0.0}"
+_TCL_ROW_RE = re.compile(r'\{([^{}]*)\}')
+
+def _parse_matrix(text: str) -> np.ndarray:
+	"""
+	Parse the matrix printed as a Tcl list of rows (eg. `"{1.0 0.0} {0.0 1.0}"`) into a 2D array.
+
+	Raises `ValueError` if there are no rows or the rows have different lengths.
+	"""
+	rows = [_parse_numbers(row, float) for row in _TCL_ROW_RE.findall(text)]
+	if not rows:
+		raise ValueError(f"No matrix rows found in Placet output: '{text.strip()}'")
+	if any(len(row) != len(rows[0]) for row in rows):
+		raise ValueError(f"The matrix rows have different lengths {[len(row) for row in rows]} in Placet output: '{text.strip()}'")
+	return np.array(rows)
+
+def _wait_for_file_stable(filename: str, timeout: float = 0.3, poll_interval: float = 0.005):
+	"""
+	Wait until the file stops changing.
+
+	The file size is checked every `poll_interval` seconds, the file is considered ready when the size 
+	is the same for 2 consecutive checks. Returns after `timeout` seconds in any case.
+	"""
+	start, last_size = perf_counter(), None
+	while perf_counter() - start < timeout:
+		try:
+			size = os.stat(filename).st_size
+		except OSError:
+			size = None
+		if size is not None and size == last_size:
+			return
+		last_size = size
+		sleep(poll_interval)
 
 def _generate_command(command_name: str, param_list: List[str], **command_details) -> str:
 	"""
 	Generate the command for Placet.
 
+	The options are generated by the builder created once for each list of
+	parameters (see `_command_builder()`).
+
 	Parameters
 	----------
 	command_name
@@ -32,15 +175,8 @@ def _generate_command(command_name: str, param_list: List[str], **command_detail
 		The constructed command.
 
 	"""
-	res = command_name
-	for key in _extract_subset(param_list, command_details):
-		res += f" -{key} {command_details[key]}"
-	
-	if command_details.get('no_nextline', False):
-		return res
-	
-	res += "\n"
-	return res
+	res = command_name + _command_builder(tuple(param_list))(command_details)
+	return res if command_details.get('no_nextline', False) else res + "\n"
 
 class Placet(Placetpy):
 	"""
@@ -61,20 +197,37 @@ class Placet(Placetpy):
 			If `True` (default is `True`) , invoking [`save_debug_info()`][placetmachine.placet.placetwrap.Placet.save_debug_info].
 		send_delay : float
 			The time delay before each data transfer to a child process (sometimes needed for stability).
-			Default is `Placet._BUFFER_MAXSIZE`.
+			Default is `Placet._DELAY_BEFORE_SEND` (no delay).
+		verbose_debug : bool
+			If `True` (default is `False`), the execution summaries in debug mode are printed as indented JSON.
+		echo : bool
+			If `False` (default is `True`), starts the process with the terminal echo switched off.
+			See [`Communicator`][placetmachine.placet.communicator.Communicator].
+		debug_max : int
+			The maximum number of the records kept in debug mode, the oldest ones are dropped.
+			See [`Communicator`][placetmachine.placet.communicator.Communicator].
 		"""
 		super(Placet, self).__init__("placet", **Placetpy_params)
+		# the last seed set with `RandomReset()`
+		self.errors_seed = None
+		# the elements IDs lists of the current beamline, see `get_element_lists()`
+		self._current_beamline, self._element_lists = None, {}
+		# the commands waiting to be sent, see `flush_commands()`
+		self._cmd_buffer = []
+		# the values read with `ElementGetAttribute()`
+		self._attributes_cache = {}
+		# the commands of the procedure being declared, see `placet_proc()`
+		self._proc_body = None
 
 	_exec_params = PlacetCommand.optional_parameters
 
-	survey_erorrs = ['quadrupole_x', 'quadrupole_y', 'quadrupole_xp', 'quadrupole_yp', 
-		'quadrupole_roll', 'cavity_x', 'cavity_realign_x', 'cavity_y', 'cavity_realign_y', 
-		'cavity_xp', 'cavity_yp', 'cavity_dipole_x', 'cavity_dipole_y', 'piece_x', 'piece_xp', 
-		'piece_y', 'piece_yp', 'bpm_x', 'bpm_y', 'bpm_xp', 'bpm_yp', 'bpm_roll',
-		'sbend_x', 'sbend_y', 'sbend_xp', 'sbend_yp', 'sbend_roll']
+	survey_erorrs = list(_SURVEYERRORSET_OPTS)
 
 	surveys = ["None", "Zero", "Clic", "Nlc", "Atl", "AtlZero", "Atl2", "AtlZero2", "Earth"]
 
+	# element types with the `*NumberList` command, see `Placet.get_element_lists()`
+	_NUMBER_LIST_TYPES = ("Quadrupole", "Cavity", "Bpm", "Dipole", "Collimator")
+
 	def __repr__(self):
 		return f"Placet(debug_mode = {self.debug_mode}, save_logs = {self._save_logs}, send_delay = {self._send_delay}, show_intro = {self._show_intro})"
 
@@ -82,20 +235,30 @@ class Placet(Placetpy):
 		return f"Placet(is_alive = {self.isalive()})"
 
 	def logging(func):
+		"""
+		Decorator recording the run time and the result of the command in debug mode.
+
+		Outside of debug mode, the command is called right away without timing it.
 
+		The records are added to the debug data and passed to the module logger at the `DEBUG` level.
+		The message is formatted by the logger, so the result is not converted to a string unless the 
+		logger is configured to output it.
+		"""
+		name = func.__name__
 		@wraps(func)
 		def wrapper(self, *args, **kwargs):
-			start = time()
+			if not self._debug_mode:
+				return func(self, *args, **kwargs)
+			start = perf_counter()
 			res = func(self, *args, **kwargs)
-			run_time = time() - start
-			if self.debug_mode:
-				self.debug_data = self.debug_data.append(dict(function = func.__name__, run_time = run_time, res = res), ignore_index = True)
-				print(func.__name__, run_time, res)
+			run_time = perf_counter() - start
+			self._debug_rows.append(dict(function = name, run_time = run_time, res = res))
+			_log.debug("%s %.6f %s", name, run_time, res)
 			return res
 		return wrapper
 
 
-	def __construct_command(self, command: str, command_params: List[str], **command_details):
+	def __construct_command(self, command: str, command_params: List[str], *, cmd_type: Optional[str] = None, **command_details):
 		"""
 		Generic function for creating a `PlacetCommand`.
 		
@@ -108,10 +271,19 @@ class Placet(Placetpy):
 			Command name.
 		command_params
 			The full list of the arguments the corresponding command in the Placet TCL can take.
+		cmd_type
+			The type of the command. If not given, it is the first word of `command`.
 
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand]
 		"""
-		return PlacetCommand(_generate_command(command, command_params, **command_details), **dict(_extract_dict(self._exec_params, command_details), type = command.split()[0]))
+		# when there are no options, the command is given in full
+		text = command + _command_builder(tuple(command_params))(command_details) if command_params else command
+		if not command_details.get('no_nextline', False):
+			text += "\n"
+
+		exec_details = _extract_dict(self._exec_params, command_details)
+		exec_details['type'] = cmd_type if cmd_type is not None else command.split(None, 1)[0]
+		return PlacetCommand(text, **exec_details)
 
 	def __set_puts_command(self, command: str, command_params: List[str], **command_details):
 		"""
@@ -122,7 +294,10 @@ class Placet(Placetpy):
 		set tmp [command param1 param2 ..]
 		puts $tmp
 		```
-		The data read with the last `puts` is returned.
+		The data read with the last `puts` is returned. Both commands are sent in a single line,
+		so there is only one exchange with Placet. The interactive shell prints only the result
+		of the last command, which for `puts` is empty, so only the data printed by `puts` is read.
+		The output is read as one block up to the prompt, instead of line by line.
 
 		Parameters
 		----------
@@ -134,8 +309,9 @@ class Placet(Placetpy):
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand]
 
 		"""
-		self.set("tmp", "[" + _generate_command(command, command_params, **dict(command_details, no_nextline = True)) + "]")
-		return self.puts("tmp")
+		script = "set tmp [" + _generate_command(command, command_params, **dict(command_details, no_nextline = True)) + "]; puts $tmp\n"
+		self.run_command(PlacetCommand(script, **dict(_extract_dict(self._exec_params, command_details), type = "puts", additional_lineskip = 0)))
+		return "".join(self.readlines(None, command_details.get('timeout', self._BASE_TIMEOUT)))
 
 	def TwissPlotStep(self, **command_details):
 		"""
@@ -178,12 +354,11 @@ class Placet(Placetpy):
 		14. disp_y(s) [m/GeV] (of average over slices).
 		15. disp_yp(s) [rad/GeV] (of average over slices).
 		"""
-		_options_list = ['file', 'beam', 'step', 'start', 'end', 'list']
 
 		if not 'file' in command_details:
 			raise ValueError("'file' is not specified")
 
-		self.run_command(self.__construct_command("TwissPlotStep", _options_list, **dict(command_details, expect_after = True)))
+		self.run_command(self.__construct_command("TwissPlotStep", _TWISSPLOTSTEP_OPTS, **dict(command_details, expect_after = True)))
 
 	def FirstOrder(self, **command_details):
 		"""
@@ -191,7 +366,7 @@ class Placet(Placetpy):
 		
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		self.run_command(self.__construct_command("FirstOrder 1", [], **command_details))
+		self.run_command(self.__construct_command("FirstOrder 1", [], cmd_type = "FirstOrder", **command_details))
 
 	def set(self, variable: str, value: float, **command_details):
 		"""
@@ -207,15 +382,51 @@ class Placet(Placetpy):
 			The value the variable to be set to.
 		
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
+		With `no_wait = True`, the value Placet outputs is not read back.
 
 		Returns
 		-------
 		value
 			The value that was set.
 		"""
-		self.run_command(self.__construct_command("set " + variable + " " + str(value), [], **command_details))
+		self.run_command(self.__construct_command(f"set {variable} {value}", [], cmd_type = "set", **command_details))
 		return value
 
+	def set_tcl_list(self, name: str, values_list: List[float], **command_details):
+		"""
+		Declare the Tcl list in Placet.
+
+		The values are sent in lines not longer than `Placet._BUFFER_MAXSIZE` characters: the first 
+		chunk is declared with `set`, the rest are added with `lappend`. This way the long lists 
+		do not exceed the terminal line limit. `lappend` is followed by an empty `list`, so Placet 
+		does not print the list accumulated so far after each chunk.
+
+		Parameters
+		----------
+		name
+			Name of the list.
+		values_list
+			The values to put in the list.
+
+		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
+		"""
+		# formatting all the values with a single `%` operation, then splitting the text into lines at the spaces
+		values_list = values_list.tolist() if isinstance(values_list, np.ndarray) else list(values_list)
+		text = ("%s " * len(values_list)) % tuple(values_list)
+		chunks, start = [], 0
+		while start < len(text):
+			end = start + self._BUFFER_MAXSIZE
+			if end < len(text):
+				split = text.rfind(" ", start, end + 1)
+				end = split if split > start else text.find(" ", end)
+			chunks.append(text[start:end].strip())
+			start = end + 1
+		chunks = chunks or [""]
+
+		self.set(name, "[list " + chunks[0] + "]", **command_details)
+		for chunk in chunks[1:]:
+			self.run_command(self.__construct_command(f"lappend {name} {chunk}; list", [], cmd_type = "lappend", **dict(command_details, additional_lineskip = 0)))
+
 	def set_list(self, name: str, **command_details):
 		"""
 		Declare the dictionary in Placet
@@ -226,9 +437,12 @@ class Placet(Placetpy):
 			Name of the dictionary.
 
 		All the keyword variables provided are going to be declared int the dictionary in Placet.
+		The assignments are sent in a single line. The value Placet outputs is not read - it is 
+		consumed by the prompt `expect` of the next command (see `no_wait` in [`PlacetCommand`][placetmachine.placet.pyplacet.PlacetCommand]).
 		"""
-		for key in command_details:
-			self.set(f"{name}({key})", command_details[key])
+		if command_details == {}:
+			return
+		self.run_command(PlacetCommand("; ".join(f"set {name}({key}) {value}" for key, value in command_details.items()) + "\n", type = "set", additional_lineskip = 1, no_wait = True))
 
 	def puts(self, variable: str, **command_details) -> str:
 		"""
@@ -248,7 +462,7 @@ class Placet(Placetpy):
 		str
 			The value Placet returned.
 		"""
-		self.run_command(self.__construct_command("puts $" + variable, [], **command_details))
+		self.run_command(self.__construct_command(f"puts ${variable}", [], cmd_type = "puts", **command_details))
 
 		if command_details.get('no_read', False):
 			return None
@@ -272,7 +486,7 @@ class Placet(Placetpy):
 
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		self.run_command(self.__construct_command("source " + filename, [], **command_details))
+		self.run_command(self.__construct_command(f"source {filename}", [], cmd_type = "source", **command_details))
 
 #	@logging
 	def TestNoCorrection(self, **command_details) -> pd.DataFrame:
@@ -319,33 +533,31 @@ class Placet(Placetpy):
 			The number of rows correspond to the number of the machines simulated.
 
 		"""
-		if not 'beam' in command_details:
-			raise Exception("'beam' parameter is missing")
+		_require(command_details, 'beam')
 		
-		_options_list, _extra_time = ['machines', 'beam', 'survey', 'emitt_file', 'bpm_res', 'format'], 20.0
+		_extra_time = 20.0
 
-		self.run_command(self.__construct_command("TestNoCorrection", _options_list, **command_details))
-		data_log = pd.DataFrame(columns = ['correction', 'beam', 'survey', 'positions_file', 'emittx', 'emitty'])
+		self.run_command(self.__construct_command("TestNoCorrection", _TESTNOCORRECTION_OPTS, **command_details))
+		n_machines = command_details.get('machines', 1)
+		emittx, emitty = np.empty(n_machines), np.empty(n_machines)
 
 		#Since execution of TestNoCorrection takes time, we increase the default timeout
 		timeout = command_details.get('timeout', _extra_time)
 
-		for i in range(command_details.get('machines', 1)):
+		for i in range(n_machines):
 			if i > 0: self.skipline(timeout)	#	iteration i
-			emittx_tmp = float(self.readline(timeout).split()[-1])
+			emittx[i] = float(self.readline(timeout).rsplit(None, 1)[-1])
 			if i > 0: self.skipline(timeout)	#	mean values and errors
-			emitty_tmp = float(self.readline(timeout).split()[-1])
+			emitty[i] = float(self.readline(timeout).rsplit(None, 1)[-1])
 			if i > 0: self.skipline(timeout)	#	mean values and errors
-			track_tmp = pd.DataFrame({
-				'correction': "No",
-#				'errors_seed': self.errors_seed if hasattr(self, 'errors_seed') else None, 
-				'beam': command_details.get('beam'), 
-				'survey': command_details.get('survey', None), 
-				'positions_file': command_details.get("errors_file", None), 
-				'emittx': emittx_tmp, 
-				'emitty': emitty_tmp}, index = [i])
-			data_log = pd.concat([data_log, track_tmp])
-		return data_log
+		return pd.DataFrame({
+			'correction': "No",
+			'beam': command_details.get('beam'),
+			'survey': command_details.get('survey', None),
+			'positions_file': command_details.get("errors_file", None),
+			'emittx': emittx,
+			'emitty': emitty
+		})
 
 #	@logging
 	def TestSimpleCorrection(self, **command_details) -> pd.DataFrame:
@@ -407,32 +619,28 @@ class Placet(Placetpy):
 			The number of rows correspond to the number of the machines simulated.
 
 		"""
-		if not 'beam' in command_details:
-			raise Exception("'beam' parameter is missing")
+		_require(command_details, 'beam')
 
-		_extra_time, _options_list = 120.0, ['machines', 'start', 'end', 'interleave', 'binlength', 'binoverlap', 'jitter_x', 'jitter_y', 'bpm_resolution', 'beam', 'testbeam',
-		'survey', 'emitt_file', 'bin_list', 'bin_file_out', 'bin_file_in', 'correctors']
+		_extra_time = 120.0
 
-		self.run_command(self.__construct_command("TestSimpleCorrection", _options_list, **command_details))
+		self.run_command(self.__construct_command("TestSimpleCorrection", _TESTSIMPLECORRECTION_OPTS, **command_details))
 
-		data_log = pd.DataFrame(columns = ['correction', 'beam', 'survey', 'positions_file', 'emittx', 'emitty'])
+		n_machines = command_details.get('machines', 1)
+		emitty = np.empty(n_machines)
 
 		timeout = command_details.get('timeout', _extra_time)
 
-		for i in range(command_details.get('machines', 1)):
-			
-			track_tmp = pd.DataFrame({
-				'correction': "1-2-1",
-#				'errors_seed': self.errors_seed if hasattr(self, 'errors_seed') else None, 
-				'beam': command_details.get('beam'), 
-				'survey': command_details.get('survey', None),
-				'positions_file': command_details.get("errors_file", None), 
-				'emittx': None, 
-				'emitty': float(self.readline(timeout).split()[-3])
-			}, index = [i])
-			data_log = pd.concat([data_log, track_tmp])
+		for i in range(n_machines):
+			emitty[i] = float(self.readline(timeout).rsplit(None, 3)[-3])
 		self.skipline()	#sum of the simulations over several machines
-		return data_log
+		return pd.DataFrame({
+			'correction': "1-2-1",
+			'beam': command_details.get('beam'),
+			'survey': command_details.get('survey', None),
+			'positions_file': command_details.get("errors_file", None),
+			'emittx': None,
+			'emitty': emitty
+		})
 
 	def TestFreeCorrection(self, **command_details) -> pd.DataFrame:
 		'''
@@ -465,23 +673,24 @@ class Placet(Placetpy):
 		Not tested
 		'''
 
-		_options_list = ['machines', 'binlength', 'binoverlap', 'jitter_y', 'jitter_x', 'bpm_resolution', "rf_align", 'beam', 'survey', 'emitt_file', 'wgt0', 'wgt1', 'pwgt', 
-		'quad_set0', 'quad_set1', 'quad_set2', 'load_bins', 'save_bins']
-
-		self.run_command(self.__construct_command("TestFreeCorrection", _options_list, **command_details))
-		data_log = pd.DataFrame(columns = ['correction', 'beam', 'survey', 'positions_file', 'emittx', 'emitty'])
-		for i in range(command_details.get('machines', 1)):
-			track_tmp = pd.DataFrame({
-				'correction': "DFS",
-#				'errors_seed': self.errors_seed if hasattr(self, 'errors_seed') else None,
-				'beam': command_details.get('beam'),
-				'survey': command_details.get('survey', None),
-				'positions_file': command_details.get("errors_file", None),
-				'emittx': None,
-				'emitty': float(self.readline(timeout).split()[-2])}, index = [i])
-			data_log = pd.concat([data_log, track_tmp])
+		self.run_command(self.__construct_command("TestFreeCorrection", _TESTFREECORRECTION_OPTS, **command_details))
+
+		n_machines = command_details.get('machines', 1)
+		emitty = np.empty(n_machines)
+
+		timeout = command_details.get('timeout', self._BASE_TIMEOUT)
+
+		for i in range(n_machines):
+			emitty[i] = float(self.readline(timeout).rsplit(None, 2)[-2])
 		self.skipline()	#sum of the simulations over several machines
-		return data_log
+		return pd.DataFrame({
+			'correction': "DFS",
+			'beam': command_details.get('beam'),
+			'survey': command_details.get('survey', None),
+			'positions_file': command_details.get("errors_file", None),
+			'emittx': None,
+			'emitty': emitty
+		})
 
 	def TestMeasuredCorrection(self, **command_details) -> pd.DataFrame:
 		"""
@@ -580,28 +789,26 @@ class Placet(Placetpy):
 			The number of rows correspond to the number of the machines simulated.
 		"""
 
-		_extra_time, _options_list = 300.0, ['machines', 'start', 'end', 'binlength', 'correct_full_bin', 'binoverlap', 'jitter_x', 'jitter_y', 'bpm_resolution', 'rf_align',
-		'no_acc', 'beam0', 'beam1', 'beam2', 'cbeam0', 'cbeam1', 'cbeam2', 'gradient1', 'gradient2', 'survey', 'emitt_file', 'wgt0', 'wgt1', 'wgt2', 'pwgt', 'quad_set0', 
-		'quad_set1', 'quad_set2', 'load_bins', 'save_bins', 'gradient_list0', 'gradient_list1', 'gradient_list2', 'bin_iterations', 'beamline_iterations', 'correctors']
+		_extra_time = 300.0
 
-		self.run_command(self.__construct_command("TestMeasuredCorrection", _options_list, **command_details))
+		self.run_command(self.__construct_command("TestMeasuredCorrection", _TESTMEASUREDCORRECTION_OPTS, **command_details))
 
-		data_log = pd.DataFrame(columns = ['correction', 'beam', 'survey', 'positions_file', 'emittx', 'emitty'])
+		n_machines = command_details.get('machines', 1)
+		emitty = np.empty(n_machines)
 
 		timeout = command_details.get('timeout', _extra_time)
 
-		for i in range(command_details.get('machines', 1)):
-			track_tmp = pd.DataFrame({
-				'correction': "DFS",
-#				'errors_seed': self.errors_seed if hasattr(self, 'errors_seed') else None,
-				'beam': command_details.get('beam0'),
-				'survey': command_details.get('survey', None),
-				'positions_file': command_details.get("errors_file", None), 
-				'emittx': None, 
-				'emitty': float(self.readline(timeout).split()[-2])}, index = [i])
-			data_log = pd.concat([data_log, track_tmp])
+		for i in range(n_machines):
+			emitty[i] = float(self.readline(timeout).rsplit(None, 2)[-2])
 		self.skipline()	#sum of the simulations over several machines
-		return data_log
+		return pd.DataFrame({
+			'correction': "DFS",
+			'beam': command_details.get('beam0'),
+			'survey': command_details.get('survey', None),
+			'positions_file': command_details.get("errors_file", None),
+			'emittx': None,
+			'emitty': emitty
+		})
 
 	def TestRfAlignment(self, **command_details) -> None:
 		"""
@@ -639,8 +846,7 @@ class Placet(Placetpy):
 		
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		_extra_time, _options_list = 120, ['beam', 'testbeam', 'machines', 'binlength', 'wgt0', 'wgt1', 'pwgt', 'girder', 'bpm_resolution', 'survey', 'emitt_file']
-		self.run_command(self.__construct_command("TestRfAlignment", _options_list, **command_details))
+		self.run_command(self.__construct_command("TestRfAlignment", _TESTRFALIGNMENT_OPTS, **command_details))
 
 	def BeamlineNew(self, **command_details):
 		"""
@@ -652,6 +858,8 @@ class Placet(Placetpy):
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
 		self.run_command(self.__construct_command("BeamlineNew", [], **command_details))
+		self._current_beamline = None
+		self.invalidate_element_cache()
 
 	def BeamlineSet(self, **command_details) -> str:
 		"""
@@ -667,22 +875,145 @@ class Placet(Placetpy):
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 
 		"""
-		if not 'name' in command_details:
-			raise Exception("'name' parameter is missing")
+		_require(command_details, 'name')
 
 		self.run_command(self.__construct_command("BeamlineSet", ['name'], **command_details))
+		self._current_beamline = command_details.get('name')
+		self.invalidate_element_cache()
 		return command_details.get('name')
 
+	def invalidate_element_cache(self):
+		"""
+		Clear the cached lists of the elements IDs (see [`get_element_lists()`][placetmachine.placet.placetwrap.Placet.get_element_lists]).
+
+		Is done automatically by [`BeamlineNew()`][placetmachine.placet.placetwrap.Placet.BeamlineNew] and 
+		[`BeamlineSet()`][placetmachine.placet.placetwrap.Placet.BeamlineSet]. Has to be called when the beamline 
+		is modified by other means (eg. with the custom Tcl commands).
+		"""
+		self._element_lists = {}
+
+	def restart(self):
+		"""Restart the child process. The buffered commands are discarded."""
+		super(Placet, self).restart()
+		self._current_beamline = None
+		self.invalidate_element_cache()
+		self._cmd_buffer, self._attributes_cache = [], {}
+		self._proc_body = None
+
+	def run_command(self, command: PlacetCommand, skipline: bool = True):
+		"""
+		Run the given command in **Placet**.
+
+		When the command is created with `buffered = True`, it is only added to the buffer (see 
+		[`flush_commands()`][placetmachine.placet.placetwrap.Placet.flush_commands]). Otherwise, the buffered 
+		commands are sent first. Any command, except for `ElementGetAttribute`, may change the elements, so the cached 
+		attributes (see [`ElementGetAttribute()`][placetmachine.placet.placetwrap.Placet.ElementGetAttribute]) are cleared.
+		Inside of [`placet_proc()`][placetmachine.placet.placetwrap.Placet.placet_proc], the command is added 
+		to the procedure instead. See [`Placetpy.run_command()`][placetmachine.placet.pyplacet.Placetpy.run_command].
+		"""
+		if self._proc_body is not None:
+			self._proc_body.append(command.command)
+			return
+		if command.type != "ElementGetAttribute":
+			self._attributes_cache = {}
+		if command.buffered:
+			self._cmd_buffer.append(command)
+			return
+		if self._cmd_buffer:
+			self.flush_commands()
+		super(Placet, self).run_command(command, skipline)
+
+	def run_commands(self, commands: List[PlacetCommand], skipline: bool = True):
+		"""
+		Run several commands in **Placet** within a single write.
+
+		The buffered commands (see [`flush_commands()`][placetmachine.placet.placetwrap.Placet.flush_commands]) 
+		are sent first and the cached attributes are cleared. Inside of [`placet_proc()`][placetmachine.placet.placetwrap.Placet.placet_proc], 
+		the commands are added to the procedure instead. See [`Placetpy.run_commands()`][placetmachine.placet.pyplacet.Placetpy.run_commands].
+		"""
+		if self._proc_body is not None:
+			self._proc_body.extend(command.command for command in commands)
+			return
+		if self._cmd_buffer:
+			self.flush_commands()
+		self._attributes_cache = {}
+		super(Placet, self).run_commands(commands, skipline)
+
+	def flush_commands(self):
+		"""
+		Send the buffered commands to **Placet**.
+
+		The commands run with `buffered = True` (eg. [`ElementAddOffset()`][placetmachine.placet.placetwrap.Placet.ElementAddOffset] 
+		or [`QuadrupoleSetStrengthList()`][placetmachine.placet.placetwrap.Placet.QuadrupoleSetStrengthList]) 
+		are not sent right away, but kept until this method is called or any other command is run. 
+		They are then joined into the lines of up to `Placet._BUFFER_MAXSIZE` characters, each sent with 
+		[`Placetpy.run_commands()`][placetmachine.placet.pyplacet.Placetpy.run_commands], so there is only one 
+		exchange with Placet per line instead of one per command.
+		"""
+		if self._cmd_buffer == []:
+			return
+		commands, self._cmd_buffer = self._cmd_buffer, []
+		self._attributes_cache = {}
+
+		line, line_size = [], 0
+		for command in commands:
+			if line != [] and line_size + len(command.command) > self._BUFFER_MAXSIZE:
+				super(Placet, self).run_commands(line)
+				line, line_size = [], 0
+			line.append(command)
+			line_size += len(command.command) + 2
+		super(Placet, self).run_commands(line)
+
+	def get_element_lists(self, *element_types: str, **command_details) -> dict:
+		"""
+		Get the lists of the elements IDs of several types in one go.
+
+		Runs the corresponding `*NumberList` commands in a single line, so there is only one
+		exchange with Placet:
+		```
+		% puts [QuadrupoleNumberList]; puts [BpmNumberList]
+		```
+
+		The lists do not change for a fixed beamline, so once the beamline is set with 
+		[`BeamlineSet()`][placetmachine.placet.placetwrap.Placet.BeamlineSet], they are cached 
+		and only the ones not cached yet are requested from Placet.
+
+		Parameters
+		----------
+		element_types
+			The types of the elements. Accepted values are `"Quadrupole"`, `"Cavity"`, `"Bpm"`, 
+			`"Dipole"`, and `"Collimator"`.
+
+		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
+
+		Returns
+		-------
+		dict
+			The lists of the elements IDs, with the element types as keys.
+		"""
+		for element_type in element_types:
+			if element_type not in self._NUMBER_LIST_TYPES:
+				raise ValueError(f"'{element_type}' - incorrect element type. Accepted values are: {self._NUMBER_LIST_TYPES}.")
+
+		# before the beamline is set, the elements are still being added
+		cache = self._element_lists if self._current_beamline is not None else {}
+		missing = [element_type for element_type in dict.fromkeys(element_types) if element_type not in cache]
+		if missing:
+			self.run_command(self.__construct_command("; ".join(f"puts [{element_type}NumberList]" for element_type in missing), [], cmd_type = "puts", **command_details))
+			read = (lambda: self.readline(command_details['timeout'])) if 'timeout' in command_details else self.readline
+			for element_type in missing:
+				cache[element_type] = _parse_numbers(read(), np.int64)
+		return {element_type: list(cache[element_type]) for element_type in element_types}
+
 	def QuadrupoleNumberList(self, **command_details) -> List[int]:
 		"""
 		Run the 'QuadrupoleNumberList' command in Placet.
 
 		It returns the list quadrupoles IDs.
 		
-		The following chain is executed:
+		The following command is executed (see [`get_element_lists()`][placetmachine.placet.placetwrap.Placet.get_element_lists]):
 		```
-		% set tmp [QuadrupoleNumberList]
-		% puts $tmp
+		% puts [QuadrupoleNumberList]
 		```
 		*An alternative is the use of [`Beamline`][placetmachine.lattice.lattice.Beamline].*
 		
@@ -693,7 +1024,7 @@ class Placet(Placetpy):
 		List[int]
 			The list with the quadrupoles IDs.
 		"""
-		return list(map(lambda x: int(x), self.__set_puts_command("QuadrupoleNumberList", [], **command_details).split()))
+		return self.get_element_lists("Quadrupole", **command_details)["Quadrupole"]
 
 	def CavityNumberList(self, **command_details) -> List[int]:
 		"""
@@ -701,10 +1032,9 @@ class Placet(Placetpy):
 
 		It returns the list cavities IDs.
 		
-		The following chain is executed:
+		The following command is executed (see [`get_element_lists()`][placetmachine.placet.placetwrap.Placet.get_element_lists]):
 		```
-		% set tmp [CavityNumberList]
-		% puts $tmp
+		% puts [CavityNumberList]
 		```
 		*An alternative is the use of [`Beamline`][placetmachine.lattice.lattice.Beamline].*
 		
@@ -715,7 +1045,7 @@ class Placet(Placetpy):
 		List[int]
 			The list with the cavities IDs.
 		"""
-		return list(map(lambda x: int(x), self.__set_puts_command("CavityNumberList", [], **command_details).split()))
+		return self.get_element_lists("Cavity", **command_details)["Cavity"]
 
 	def BpmNumberList(self, **command_details) -> List[int]:
 		"""
@@ -723,10 +1053,9 @@ class Placet(Placetpy):
 
 		It returns the list BPMs IDs.
 
-		The following chain is executed:
+		The following command is executed (see [`get_element_lists()`][placetmachine.placet.placetwrap.Placet.get_element_lists]):
 		```
-		% set tmp [BpmNumberList]
-		% puts $tmp
+		% puts [BpmNumberList]
 		```
 		*An alternative is the use of [`Beamline`][placetmachine.lattice.lattice.Beamline].*
 		
@@ -737,7 +1066,7 @@ class Placet(Placetpy):
 		List[int]
 			The list with the BPMs IDs.
 		"""
-		return list(map(lambda x: int(x), self.__set_puts_command("BpmNumberList", [], **command_details).split()))
+		return self.get_element_lists("Bpm", **command_details)["Bpm"]
 
 	def DipoleNumberList(self, **command_details) -> List[int]:
 		"""
@@ -745,10 +1074,9 @@ class Placet(Placetpy):
 
 		It returns the list dipoles IDs.
 		
-		The following chain is executed:
+		The following command is executed (see [`get_element_lists()`][placetmachine.placet.placetwrap.Placet.get_element_lists]):
 		```
-		% set tmp [DipoleNumberList]
-		% puts $tmp
+		% puts [DipoleNumberList]
 		```
 
 		*An alternative is the use of [`Beamline`][placetmachine.lattice.lattice.Beamline].*
@@ -760,7 +1088,7 @@ class Placet(Placetpy):
 		List[int]
 			The list with the dipoles IDs.
 		"""
-		return list(map(lambda x: int(x), self.__set_puts_command("DipoleNumberList", [], **command_details).split()))
+		return self.get_element_lists("Dipole", **command_details)["Dipole"]
 
 	def MultipoleNumberList(self, **command_details) -> List[int]:
 		"""
@@ -788,10 +1116,9 @@ class Placet(Placetpy):
 		List[int]
 			The list with the multipoles IDs.
 		"""
-		if not 'order' in command_details:
-			raise Exception("'order' parameter is missing.")
+		_require(command_details, 'order')
 		
-		return list(map(lambda x: int(x), self.__set_puts_command("MultipoleNumberList", ['order'], **command_details).split()))
+		return _parse_numbers(self.__set_puts_command("MultipoleNumberList", ['order'], **command_details), np.int64)
 
 	def CollimatorNumberList(self, **command_details) -> List[int]:
 		"""
@@ -799,10 +1126,9 @@ class Placet(Placetpy):
 
 		It returns the list collimators IDs.
 		
-		The following chain is executed:
+		The following command is executed (see [`get_element_lists()`][placetmachine.placet.placetwrap.Placet.get_element_lists]):
 		```
-		% set tmp [CollimatorNumberList]
-		% puts $tmp
+		% puts [CollimatorNumberList]
 		```
 		
 		*An alternative is the use of [`Beamline`][placetmachine.lattice.lattice.Beamline].*
@@ -814,7 +1140,7 @@ class Placet(Placetpy):
 		List[int]
 			The list with the colimators IDs.
 		"""
-		return list(map(lambda x: int(x), self.__set_puts_command("CollimatorNumberList", [], **command_details).split()))
+		return self.get_element_lists("Collimator", **command_details)["Collimator"]
 
 	def CavityGetPhaseList(self, **command_details) -> List[float]:
 		"""
@@ -837,7 +1163,7 @@ class Placet(Placetpy):
 		List[float]
 			The list of the cavities phases.
 		"""
-		return list(map(lambda x: int(x), self.__set_puts_command("CavityGetPhaseList", [], **command_details)))
+		return _parse_numbers(self.__set_puts_command("CavityGetPhaseList", [], **command_details), np.float64)
 
 	def QuadrupoleGetStrength(self, quad_number: int, **command_details) -> float:
 		"""
@@ -867,7 +1193,7 @@ class Placet(Placetpy):
 
 		***Needs to be verified!***
 		"""
-		return float(self.__set_puts_command("QuadrupoleGetStrength " + str(quad_number), [], **command_details).split()[-1])
+		return float(self.__set_puts_command(f"QuadrupoleGetStrength {quad_number}", [], **command_details).rsplit(None, 1)[-1])
 
 	def QuadrupoleSetStrength(self, quad_number: int, value: float, **command_details):
 		"""
@@ -884,7 +1210,7 @@ class Placet(Placetpy):
 		
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		self.run_command(PlacetCommand("QuadrupoleSetStrength " + str(quad_number) + " " + str(value) + "\n"))
+		self.run_command(PlacetCommand(f"QuadrupoleSetStrength {quad_number} {value}\n", **_extract_dict(self._exec_params, command_details)))
 
 	def QuadrupoleSetStrengthList(self, values_list: List[float], **command_details):
 		"""
@@ -900,9 +1226,14 @@ class Placet(Placetpy):
 		values_list : List[float]
 			The list with the quadrupoles strengths.
 
+		Other parameters
+		----------------
+		buffered : bool
+			If `True` (default is `False`), the command is buffered and sent later, see [`flush_commands()`][placetmachine.placet.placetwrap.Placet.flush_commands].
+
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		self.run_command(self.__construct_command("QuadrupoleSetStrengthList " + "{".join(list(map(lambda x: " " + str(x), values_list))) + "}", [], **command_details))
+		self.run_command(self.__construct_list_command("QuadrupoleSetStrengthList", values_list, **command_details))
 
 	def CavitySetGradientList(self, values_list, **command_details):
 		"""
@@ -918,9 +1249,14 @@ class Placet(Placetpy):
 		values_list: list(float)
 			The list with cavities gradients
 
+		Other parameters
+		----------------
+		buffered : bool
+			If `True` (default is `False`), the command is buffered and sent later, see [`flush_commands()`][placetmachine.placet.placetwrap.Placet.flush_commands].
+
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		self.run_command(self.__construct_command("CavitySetGradientList " + "{".join(list(map(lambda x: " " + str(x), values_list))) + "}", [], **command_details))
+		self.run_command(self.__construct_list_command("CavitySetGradientList", values_list, **command_details))
 
 	def CavitySetPhaseList(self, values_list: List[float], **command_details):
 		"""
@@ -936,15 +1272,75 @@ class Placet(Placetpy):
 		values_list
 			The list with cavities gradients.
 
+		Other parameters
+		----------------
+		buffered : bool
+			If `True` (default is `False`), the command is buffered and sent later, see [`flush_commands()`][placetmachine.placet.placetwrap.Placet.flush_commands].
+
+		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
+		"""
+		self.run_command(self.__construct_list_command("CavitySetPhaseList", values_list, **command_details))
+
+	def __construct_list_command(self, command: str, values_list: List[float], **command_details) -> PlacetCommand:
+		"""
+		Create a `PlacetCommand` for the commands that take a list of values, like 
+		[`QuadrupoleSetStrengthList()`][placetmachine.placet.placetwrap.Placet.QuadrupoleSetStrengthList].
+
+		Parameters
+		----------
+		command
+			Command name.
+		values_list
+			The list of the values to pass. Can be a numpy array.
+
+		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
+		"""
+		if isinstance(values_list, np.ndarray):
+			# converting to Python numbers in one pass is much faster than formatting the numpy scalars
+			values_list = values_list.tolist()
+		# the values are passed as a braced Tcl list, eg. "{1.0 2.0 3.0}"
+		return self.__construct_command(command + " {" + " ".join(map(str, values_list)) + "}", [], cmd_type = command, **command_details)
+
+	def set_element_lists(self, **command_details):
+		"""
+		Set the quadrupoles' strengths and/or cavities' gradients and phases in Placet.
+
+		The values are declared as Tcl lists with [`set_tcl_list()`][placetmachine.placet.placetwrap.Placet.set_tcl_list].
+		After that, runs the combination of [`QuadrupoleSetStrengthList()`][placetmachine.placet.placetwrap.Placet.QuadrupoleSetStrengthList],
+		[`CavitySetGradientList()`][placetmachine.placet.placetwrap.Placet.CavitySetGradientList], and
+		[`CavitySetPhaseList()`][placetmachine.placet.placetwrap.Placet.CavitySetPhaseList] as one line,
+		waiting for the prompt only once.
+
+		Other parameters
+		----------------
+		quad_strengths : List[float]
+			The list with the quadrupoles strengths.
+		cav_gradients : List[float]
+			The list with the cavities gradients.
+		cav_phases : List[float]
+			The list with the cavities phases.
+
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		self.run_command(self.__construct_command("CavitySetPhaseList " + "{".join(list(map(lambda x: " " + str(x), values_list))) + "}", [], **command_details))
+		_lists = {'quad_strengths': "QuadrupoleSetStrengthList", 'cav_gradients': "CavitySetGradientList", 'cav_phases': "CavitySetPhaseList"}
+		_exec_details = _extract_dict(self._exec_params, command_details)
+		commands = []
+		for key in _extract_subset(_lists, command_details):
+			# the values are passed through the Tcl variables to keep the lines short
+			self.set_tcl_list(f"{key}_tmp", command_details[key])
+			commands.append(self.__construct_command(f"{_lists[key]} ${key}_tmp", [], **_exec_details))
+		if commands != []:
+			self.run_commands(commands)
 
 	def ElementGetAttribute(self, element_id: int, parameter: str, **command_details) -> float:
 		"""
 		Run 'ElementGetAttribute' command in Placet.
 
 		It extracts the value of the element's parameter with the given id.
+
+		The values read are cached until any other command is run in Placet (see 
+		[`run_command()`][placetmachine.placet.placetwrap.Placet.run_command]), so the repeated 
+		queries in between the changes of the beamline do not go to Placet.
 		
 		*A better alternative is the use of [`Beamline`][placetmachine.lattice.lattice.Beamline].*
 
@@ -962,8 +1358,13 @@ class Placet(Placetpy):
 		float
 			The extracted value.
 		"""
-		self.run_command(self.__construct_command("ElementGetAttribute " + str(element_id) + " -" + parameter, []), **command_details)
-		return float(self.readline().split()[-1])
+		key = (element_id, parameter)
+		if key in self._attributes_cache:
+			return self._attributes_cache[key]
+
+		self.run_command(self.__construct_command(f"ElementGetAttribute {element_id} -{parameter}", [], cmd_type = "ElementGetAttribute", **command_details))
+		self._attributes_cache[key] = float("".join(self.readlines()).rsplit(None, 1)[-1])
+		return self._attributes_cache[key]
 
 	def ElementSetAttributes(self, element_id: int, **command_details):
 		"""
@@ -980,17 +1381,7 @@ class Placet(Placetpy):
 
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		quads_option = ['name', 's', 'x', 'y', 'xp', 'yp', 'roll', 'length', 'synrad', 'six_dim', 'thin_lens', 'e0', 'aperture_x', 'aperture_y', 'aperture_losses', 'aperture_shape',
-		'strength', 'tilt', 'hcorrector', 'hcorrector_step_size', 'vcorrector', 'vcorrector_step_size']
-		additional_sbend_option = ['angle', 'E1', 'E2', 'K', 'K2']
-		additional_bpm_option = ['resolution', 'reading_x', 'reading_y', 'scale_x', 'scale_y', 'store_bunches']
-		additional_cavity_option = ['gradient', 'phase', 'type', 'lambda', 'frequency']
-		additional_dipole_option = ['strength_x', 'strength_y']
-		additional_multipole_option = ['steps']
-
-		_options_list = quads_option + additional_sbend_option + additional_bpm_option + additional_cavity_option + additional_dipole_option + additional_multipole_option
-
-		self.run_command(self.__construct_command("ElementSetAttributes " + str(element_id), _options_list, **command_details))
+		self.run_command(self.__construct_command(f"ElementSetAttributes {element_id}", _ELEMENTSETATTRIBUTES_OPTS, cmd_type = "ElementSetAttributes", **command_details))
 
 	def WriteGirderLength(self, **command_details):
 		"""
@@ -998,12 +1389,9 @@ class Placet(Placetpy):
 
 		***Needs to checked***
 		"""
-		if not 'file' in command_details:
-			raise Exception("'file' parameter is missing")
-
-		_options_list = ['file', 'binary', 'beginning_only', 'absolute_position']		
+		_require(command_details, 'file')
 
-		self.run_command(self.__construct_command("WriteGirderLength", _options_list, **command_details))
+		self.run_command(self.__construct_command("WriteGirderLength", _WRITEGIRDERLENGTH_OPTS, **command_details))
 
 	def SurveyErrorSet(self, **command_details):
 		"""
@@ -1074,11 +1462,7 @@ class Placet(Placetpy):
 		
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		_options_list = ['quadrupole_x', 'quadrupole_y', 'quadrupole_xp', 'quadrupole_yp', 'quadrupole_roll', 'cavity_x', 'cavity_realign_x', 'cavity_y', 'cavity_realign_y', 
-		'cavity_xp', 'cavity_yp', 'cavity_dipole_x', 'cavity_dipole_y', 'piece_x', 'piece_xp', 'piece_y', 'piece_yp', 'bpm_x', 'bpm_y', 'bpm_xp', 'bpm_yp', 'bpm_roll',
-		'sbend_x', 'sbend_y', 'sbend_xp', 'sbend_yp', 'sbend_roll']
-
-		self.run_command(self.__construct_command("SurveyErrorSet", _options_list, **command_details))
+		self.run_command(self.__construct_command("SurveyErrorSet", _SURVEYERRORSET_OPTS, **command_details))
 
 
 	def Clic(self, **command_details):
@@ -1096,9 +1480,7 @@ class Placet(Placetpy):
 
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		_options_list = ['start', 'end']
-
-		self.run_command(self.__construct_command("Clic", _options_list, **command_details))
+		self.run_command(self.__construct_command("Clic", _CLIC_OPTS, **command_details))
 
 	def Zero(self, **command_details):
 		"""
@@ -1135,11 +1517,8 @@ class Placet(Placetpy):
 
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		if not 'file' in command_details:
-			raise Exception("'file' parameter is missing")
-		_options_list = ['file', 'binary', 'nodrift', 'vertical_only', 'positions_only', 'cav_bpm', 'cav_grad_phas']
-		
-		self.run_command(self.__construct_command("SaveAllPositions", _options_list, **dict(command_details, expect_after = True)))
+		_require(command_details, 'file')
+		self.run_command(self.__construct_command("SaveAllPositions", _SAVEALLPOSITIONS_OPTS, **dict(command_details, expect_after = True)))
 
 	def ReadAllPositions(self, **command_details):
 		"""
@@ -1168,11 +1547,8 @@ class Placet(Placetpy):
 
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		if not 'file' in command_details:
-			raise Exception("'file' parameter is missing")
-		_options_list = ['file', 'binary', 'nodrift', 'nomultipole', 'vertical_only', 'positions_only', 'cav_bpm', 'cav_grad_phas']
-
-		self.run_command(self.__construct_command("ReadAllPositions", _options_list, **command_details))
+		_require(command_details, 'file')
+		self.run_command(self.__construct_command("ReadAllPositions", _READALLPOSITIONS_OPTS, **command_details))
 
 	def InterGirderMove(self, **command_details):
 		"""
@@ -1195,9 +1571,7 @@ class Placet(Placetpy):
 
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		_options_list = ['scatter_x', 'scatter_y', 'flo_x', 'flo_y', 'cav_only']
-
-		self.run_command(self.__construct_command("InterGirderMove", _options_list, **command_details))
+		self.run_command(self.__construct_command("InterGirderMove", _INTERGIRDERMOVE_OPTS, **command_details))
 
 	def RandomReset(self, **command_details):
 		"""
@@ -1212,10 +1586,8 @@ class Placet(Placetpy):
 		
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		_options_list = ['seed']
-
-		self.run_command(self.__construct_command("RandomReset", _options_list, **command_details))
-#		self.errors_seed = command_details.get('seed')
+		self.run_command(self.__construct_command("RandomReset", _RANDOMRESET_OPTS, **command_details))
+		self.errors_seed = command_details.get('seed')
 
 	def InjectorBeam(self, beam_name, **command_details):
 		"""
@@ -1281,11 +1653,7 @@ class Placet(Placetpy):
 
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		_options_list = ['macroparticles', 'silent', 'energyspread', 'ecut', 'energy_distribution', 'file', 'bunches', 'chargelist', 'slices', 'e0', 'charge',
-		'particles', 'last_wgt', 'distance', 'overlapp', 'phase', 'wake_scale_t', 'wake_scale_l', 'beta_x', 'alpha_x', 'emitt_x', 'beta_y', 'alpha_y', 'emitt_y',
-		'beamload']
-
-		self.run_command(self.__construct_command("InjectorBeam " + beam_name, _options_list, **command_details))
+		self.run_command(self.__construct_command(f"InjectorBeam {beam_name}", _INJECTORBEAM_OPTS, cmd_type = "InjectorBeam", **command_details))
 
 	def SetRfGradientSingle(self, beam_name: str, var1: float, l: float):
 		"""
@@ -1303,7 +1671,7 @@ class Placet(Placetpy):
 			No idea.
 		"""
 
-		self.run_command(self.__construct_command("SetRfGradientSingle " + beam_name + " " + str(var1) + " " + str(l), []))
+		self.run_command(self.__construct_command(f"SetRfGradientSingle {beam_name} {var1} {l}", [], cmd_type = "SetRfGradientSingle"))
 
 	def BeamRead(self, **command_details):
 		"""
@@ -1324,10 +1692,11 @@ class Placet(Placetpy):
 
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		_options_list = ['file', 'binary', 'binary_stream', 'beam']
-
-		sleep(0.3)	#needed to make sure the there is no file lock issues
-		self.run_command(self.__construct_command("BeamRead", _options_list, **command_details))
+		# making sure the file is completely written, there are no file lock issues
+		filename = command_details.get('file', command_details.get('binary_stream'))
+		if filename is not None:
+			_wait_for_file_stable(filename)
+		self.run_command(self.__construct_command("BeamRead", _BEAMREAD_OPTS, **command_details))
 
 	def BeamSaveAll(self, **command_details):
 		"""
@@ -1372,9 +1741,7 @@ class Placet(Placetpy):
 		16. 0
 		17. 0
 		"""
-		_options_list = ['file', 'beam', 'header', 'axis', 'binary', 'bunches']
-
-		self.run_command(self.__construct_command("BeamSaveAll", _options_list, **command_details))
+		self.run_command(self.__construct_command("BeamSaveAll", _BEAMSAVEALL_OPTS, **command_details))
 
 	def BeamDump(self, **command_details):
 		"""
@@ -1409,9 +1776,7 @@ class Placet(Placetpy):
 
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		_options_list = ['file', 'beam', 'xaxis', 'yaxis', 'binary', 'binary_stream', 'losses', 'seed', 'type', 'rotate_x', 'rotate_y']
-
-		self.run_command(self.__construct_command("BeamDump", _options_list, **command_details))
+		self.run_command(self.__construct_command("BeamDump", _BEAMDUMP_OPTS, **command_details))
 
 	def TclCall(self, **command_details):
 		"""
@@ -1444,7 +1809,7 @@ class Placet(Placetpy):
 		"""
 		self.run_command(self.__construct_command("TwissMain", ['file'], **command_details))
 
-	def GetTransferMatrix(self, **command_details) -> List[float]:
+	def GetTransferMatrix(self, **command_details) -> np.ndarray:
 		"""
 		Run'GetTransferMatrix' command in Placet.
 
@@ -1469,24 +1834,14 @@ class Placet(Placetpy):
 
 		Returns
 		-------
-		List[float]
-			Resulting transfer matrix.
+		np.ndarray
+			Resulting transfer matrix (2D array). The rows are taken from the Tcl list printed by Placet, 
+			`ValueError` is raised if they have different lengths.
 		"""
-		_options_list = ['beamline', 'start', 'end']
-			
-		if not 'beamline' in command_details:
-			raise Exception("'beamline' parameter is missing")
-
-		matrix, res_matrix = self.__set_puts_command("GetTransferMatrix", _options_list, **command_details).replace("\n", "").replace("\r", ""), []
-		for x in matrix.split("}"):
-			if x == '':
-				continue
-			data = x.replace("{", "")
-			row = []
-			for y in data.split():
-				row.append(float(y))
-			res_matrix.append(row)
-		return res_matrix
+		_require(command_details, 'beamline')
+
+		# the matrix is printed as a list of rows, eg. "{1.0 0.0} {0.0 1.0}"
+		return _parse_matrix(self.__set_puts_command("GetTransferMatrix", _GETTRANSFERMATRIX_OPTS, **command_details))
 
 	def BeamSetToOffset(self, **command_details):
 		"""
@@ -1513,9 +1868,7 @@ class Placet(Placetpy):
 
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		_options_list = ['beam', 'x', 'y', 'angle_x', 'angle_y', 'start', 'end']
-
-		self.run_command(self.__construct_command("BeamSetToOffset", _options_list, **command_details))
+		self.run_command(self.__construct_command("BeamSetToOffset", _BEAMSETTOOFFSET_OPTS, **command_details))
 
 	def ElementSetToOffset(self, index: int, **command_details):
 		"""
@@ -1547,9 +1900,7 @@ class Placet(Placetpy):
 
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		_options_list = ['x', 'y', 'xp', 'yp', 'roll', 'angle_x', 'angle_y']
-
-		self.run_command(self.__construct_command("ElementSetToOffset " + str(index), _options_list, **command_details))
+		self.run_command(self.__construct_command(f"ElementSetToOffset {index}", _ELEMENTSETTOOFFSET_OPTS, cmd_type = "ElementSetToOffset", **command_details))
 
 	def ElementAddOffset(self, index, **command_details):
 		"""
@@ -1581,9 +1932,58 @@ class Placet(Placetpy):
 
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		_options_list = ['x', 'y', 'xp', 'yp', 'roll', 'angle_x', 'angle_y']
+		self.run_command(self.__construct_command(f"ElementAddOffset {index}", _ELEMENTADDOFFSET_OPTS, cmd_type = "ElementAddOffset", **command_details))
+
+	def ElementAddOffsetList(self, indices: List[int], **command_details):
+		"""
+		Add the given offsets to the current ones of several elements.
+
+		Does the same as [`ElementAddOffset()`][placetmachine.placet.placetwrap.Placet.ElementAddOffset]
+		called for each element, but the offsets are declared as Tcl lists (see 
+		[`set_tcl_list()`][placetmachine.placet.placetwrap.Placet.set_tcl_list]) and applied with 
+		a single `foreach` loop in Placet. Recommended when misaligning many elements, as it takes 
+		a few exchanges with Placet instead of one per element.
+
+		Parameters
+		----------
+		indices
+			The element IDs. Can be a numpy array.
+		
+		Other parameters
+		----------------
+		x : List[float]
+			Horizontal offsets.
+		y : List[float]
+			Vertical offsets.
+		xp : List[float]
+			Horizontal offsets in angle [urad].
+		yp : List[float]
+			Vertical offsets in angle [urad].
+		roll : List[float]
+			Roll angles [urad].
+		angle_x : List[float]
+			Same as -xp [backward compatibility].
+		angle_y : List[float]
+			Same as -yp [backward compatibility].
+
+		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
+		"""
+		offsets = _extract_dict(_ELEMENTADDOFFSET_OPTS, command_details)
+		if not offsets:
+			return
+		for key, values in offsets.items():
+			if len(values) != len(indices):
+				raise ValueError(f"'{key}' has {len(values)} values, while {len(indices)} elements are given")
+
+		exec_details = _extract_dict(self._exec_params, command_details)
+		self.set_tcl_list("offset_list_index", indices, **exec_details)
+		for key, values in offsets.items():
+			self.set_tcl_list(f"offset_list_{key}", values, **exec_details)
 
-		self.run_command(self.__construct_command("ElementAddOffset " + str(index), _options_list, **command_details))
+		# eg. "foreach offset_index $offset_list_index offset_x $offset_list_x {ElementAddOffset $offset_index -x $offset_x}"
+		loop_vars = "".join([f" offset_{key} $offset_list_{key}" for key in offsets])
+		body = _generate_command("ElementAddOffset $offset_index", list(offsets), **{key: f"$offset_{key}" for key in offsets}, no_nextline = True)
+		self.run_command(self.__construct_command(f"foreach offset_index $offset_list_index{loop_vars} {{{body}}}", [], cmd_type = "ElementAddOffset", **exec_details))
 
 	def BpmReadings(self, **command_details):
 		"""
@@ -1600,6 +2000,34 @@ class Placet(Placetpy):
 		"""
 		self.run_command(self.__construct_command("BpmReadings", ['file'], **dict(command_details, expect_after = True)))
 
+	def run_tracking_with_readout(self, bpm_file: str, **command_details):
+		"""
+		Run the 'TestNoCorrection' command followed by the 'BpmReadings' command in Placet.
+
+		Both commands are sent in a single line, so there is only one exchange with Placet instead of
+		two. Recommended when only the BPM readings after the tracking are needed, eg.:
+		```
+		placet.run_tracking_with_readout("bpms.dat", beam = "beam0", machines = 1, survey = "from_file")
+		```
+		The output of the tracking is checked for the errors and discarded. 
+		[`BpmReadings()`][placetmachine.placet.placetwrap.Placet.BpmReadings] stays available for reading
+		the BPMs separately.
+
+		Parameters
+		----------
+		bpm_file
+			The name of the file to store the BPM readings.
+
+		Other arguments accepted are the parameters of 
+		[`TestNoCorrection()`][placetmachine.placet.placetwrap.Placet.TestNoCorrection].
+		"""
+		_require(command_details, 'beam')
+		tracking_cmd = self.__construct_command("TestNoCorrection", _TESTNOCORRECTION_OPTS, **dict(command_details, no_nextline = True))
+		script = tracking_cmd.command + "; " + _generate_command("BpmReadings", ['file'], file = bpm_file)
+		self.run_command(PlacetCommand(script, **dict(_extract_dict(self._exec_params, command_details), type = "TestNoCorrection", additional_lineskip = 0)))
+		# reading the tracking output up to the prompt, so the errors are caught
+		self.readlines(None)
+
 	def MoveGirder(self, **command_details):
 		"""
 		Run 'MoveGirder' command in Placet.
@@ -1617,9 +2045,7 @@ class Placet(Placetpy):
 		
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		_options_list = ['file', 'vertical_only', 'binary', 'scale']
-
-		self.run_command(self.__construct_command("MoveGirder", _options_list, **command_details))
+		self.run_command(self.__construct_command("MoveGirder", _MOVEGIRDER_OPTS, **command_details))
 
 	def BpmRealign(self, **command_details):
 		"""
@@ -1638,9 +2064,7 @@ class Placet(Placetpy):
 		
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		_options_list = ['error_x', 'error_y', 'bunch']
-
-		self.run_command(self.__construct_command("BpmRealign", _options_list, **command_details))
+		self.run_command(self.__construct_command("BpmRealign", _BPMREALIGN_OPTS, **command_details))
 
 	def BeamAddOffset(self, **command_details):
 		"""
@@ -1670,12 +2094,10 @@ class Placet(Placetpy):
 		end : int
 			Last particle to offset.
 		"""
-		_options_list = ['beam', 'x', 'y', 'angle_x', 'angle_y', 'rotate', 'start', 'end']
-
-		self.run_command(self.__construct_command("BeamAddOffset", _options_list, **command_details))
+		self.run_command(self.__construct_command("BeamAddOffset", _BEAMADDOFFSET_OPTS, **command_details))
 
 	"""Custom commands"""
-	def get_element_transverse_matrix(self, index : int, **command_details) -> List[float]:
+	def get_element_transverse_matrix(self, index : int, **command_details) -> np.ndarray:
 		"""
 		Evaluate the Transfer matrix of a given element.
 		
@@ -1691,8 +2113,8 @@ class Placet(Placetpy):
 
 		Returns
 		-------
-		List[float]
-			Resulting transfer matrix.
+		np.ndarray
+			Resulting transfer matrix (2D array).
 		"""
 		return self.GetTransferMatrix(beamline = command_details.get('beamline'), start = index, end = index)
 
@@ -1726,9 +2148,40 @@ class Placet(Placetpy):
 			The name of the generated file.
 		"""
 		
-		self.run_command(self.__construct_command("calc " + filename + " " + str(charge) + " " + str(a) + " " + str(b) + " " + str(sigma_z) + " " + str(n_slices), [], **command_details))
+		self.run_command(self.__construct_command(f"calc {filename} {charge} {a} {b} {sigma_z} {n_slices}", [], cmd_type = "calc", **command_details))
 		return filename
 
+	@contextmanager
+	def placet_proc(self, name: str, **command_details):
+		"""
+		Declare a custom procedure in Placet with the commands run inside of the `with` block.
+
+		The commands are not run, but collected and sent as a single line declaring the procedure:
+		```
+		with placet.placet_proc("survey"):
+			placet.ReadAllPositions(file = "positions.dat")
+		```
+		sends `proc survey {} {ReadAllPositions -file positions.dat}`. The commands collected should 
+		not be followed by reading their output (eg. [`puts()`][placetmachine.placet.placetwrap.Placet.puts] 
+		can not be used), since nothing is printed until the procedure is called.
+
+		Parameters
+		----------
+		name
+			Name of the created procedure in Placet.
+
+		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
+		"""
+		if self._proc_body is not None:
+			raise Exception("The procedures can not be nested")
+		self._proc_body = []
+		try:
+			yield
+			body = "; ".join([command.strip() for command in self._proc_body])
+		finally:
+			self._proc_body = None
+		self.run_command(PlacetCommand(f"proc {name} {{}} {{{body}}}\n", **dict(_extract_dict(self._exec_params, command_details), type = "custom", additional_lineskip = 0)))
+
 	def declare_proc(self, proc : Callable, **command_details):
 		"""
 		Declare a custom procedure in Placet.
@@ -1739,10 +2192,12 @@ class Placet(Placetpy):
 			The function in Python.
 
 			The content of the created procedure consists of the Placet commands that Python runs.
-			The parameter `addditional_lineskip = 0` is passed, since the commands within `proc()` environment in Placet
+			They are collected with [`placet_proc()`][placetmachine.placet.placetwrap.Placet.placet_proc] 
+			and sent in one line. The parameters `additional_lineskip = 0` and `no_expect = True` are 
+			passed for compatibility, since the commands within `proc()` environment in Placet
 			do not produce any output.
 
-			The function used for proc declaration should not have any return value, otherwise the execution is going
+			The function used for proc declaration should not read any output, otherwise the execution is going
 			to be blocked.
 		
 		Other parameters
@@ -1753,9 +2208,8 @@ class Placet(Placetpy):
 
 		Other arguments accepted are inherited from `PlacetCommand` but some of them will be forcely overwritten. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
-		self.run_command(PlacetCommand("proc " + command_details.get("name", proc.__name__)  + " {} {\n", type = "custom", additional_lineskip = 0, timeout = 1))
-		proc(**dict(command_details, additional_lineskip = 0, no_expect = True))
-		self.run_command(PlacetCommand("}\n", type = "custom", additional_lineskip = 0, no_expect = True))
+		with self.placet_proc(command_details.get("name", proc.__name__), timeout = 1):
+			proc(**dict(command_details, additional_lineskip = 0, no_expect = True))
 
 	"""extra commands"""
 	def _custom_command(self, command : str, **command_details):
@@ -1770,3 +2224,56 @@ class Placet(Placetpy):
 		Other arguments accepted are inherited from `PlacetCommand`. See the list [optional parameters][placetmachine.placet.pyplacet.PlacetCommand].
 		"""
 		self.run_command(PlacetCommand(command, **command_details))
+
+# idle Placet processes kept warm for reuse, along with the names of the beamlines and beams already defined in them
+_PLACET_POOL: List[tuple] = []
+
+def acquire_placet(**Placetpy_params) -> tuple:
+	"""
+	Get a Placet process from the pool of the idle ones, or start a new one if the pool is empty.
+
+	The reused process keeps the scripts sourced and the procedures declared earlier, so there is no 
+	start up cost. Its debug mode, logging and send delay are set according to `Placetpy_params`. 
+	The offsets of the beamline used last are reset with [`Zero()`][placetmachine.placet.placetwrap.Placet.Zero] 
+	and no beamline is selected, a new one has to be created and set with 
+	[`BeamlineSet()`][placetmachine.placet.placetwrap.Placet.BeamlineSet].
+
+	Other parameters
+	----------------
+	The parameters accepted are the same as for [`Placet`][placetmachine.placet.placetwrap.Placet].
+
+	Returns
+	-------
+	tuple(Placet, Optional[set])
+		The Placet process and the names of the beamlines and beams already defined in it. 
+		The names are `None` for a newly started process.
+	"""
+	while _PLACET_POOL:
+		placet, used_names = _PLACET_POOL.pop()
+		if not placet.isalive():
+			continue
+		placet.debug_mode = Placetpy_params.get('debug_mode', False)
+		placet.save_logs = Placetpy_params.get('save_logs', True)
+		placet.add_send_delay(Placetpy_params.get('send_delay', Placet._DELAY_BEFORE_SEND))
+		if placet._current_beamline is not None:
+			placet.Zero()
+		placet._current_beamline = None
+		placet.invalidate_element_cache()
+		placet._cmd_buffer, placet._attributes_cache = [], {}
+		return placet, used_names
+	
+	return Placet(**Placetpy_params), None
+
+def release_placet(placet: Placet, used_names: set):
+	"""
+	Return a Placet process to the pool of the idle ones.
+
+	Parameters
+	----------
+	placet
+		The Placet process to release.
+	used_names
+		The names of the beamlines and beams defined in the process. They cannot be reused.
+	"""
+	if placet.isalive():
+		_PLACET_POOL.append((placet, set(used_names)))
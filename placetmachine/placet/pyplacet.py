@@ -1,5 +1,7 @@
 from functools import wraps
-from typing import Callable, Optional
+import json
+import re
+from typing import Callable, Optional, List
 from placetmachine.placet import Communicator
 
 
@@ -18,18 +20,26 @@ class PlacetCommand():
 		The type of the command. Corresponds to the command name, without any options
 	additional_lineskip : int
 		The number of lines that the command produces when executed.
+	no_wait : bool
+		If `True`, the output of the command is not read after writing it.
+	buffered : bool
+		If `True`, the command is kept to be sent together with the following ones.
 	
 	"""
-	command_types = ["custom", "set", "BeamlineNew", "BeamlineSet", "source", "puts", "BeamDump", "ElementGetAttribute", "WriteGirderLength", "SurveyErrorSet", "Clic", "Zero", "SaveAllPositions", 
+	command_types = ("custom", "set", "BeamlineNew", "BeamlineSet", "source", "puts", "BeamDump", "ElementGetAttribute", "WriteGirderLength", "SurveyErrorSet", "Clic", "Zero", "SaveAllPositions", 
 					"InterGirderMove", "TestNoCorrection", "RandomReset", "TestSimpleCorrection", "ReadAllPositions", "QuadrupoleSetStrength", "InjectorBeam", "BeamRead", "wake_calc", "SetRfGradientSingle",
 	"make_beam_particles", "BeamSaveAll", "TestMeasuredCorrection", "GetTransferMatrix", "BpmNumberList", "TwissPlotStep", "FirstOrder", "BeamSetToOffset", "ElementSetToOffset",
 	"ElementAddOffset", "BpmReadings", "MoveGirder", "TestFreeCorrection", "BpmRealign", "TestRfAlignment", "QuadrupoleSetStrengthList", "CavitySetGradientList", "CavitySetPhaseList",
-	"ElementSetAttributes", "TclCall", "TwissMain"]
+	"ElementSetAttributes", "TclCall", "TwissMain")
 
 	#options that affect the execution/parsing of the commands
-	optional_parameters = ['timeout', 'additional_lineskip', 'expect_after', 'expect_before', 'no_expect']
+	optional_parameters = ['timeout', 'additional_lineskip', 'expect_after', 'expect_before', 'no_expect', 'no_wait', 'buffered']
 
-	def __init__(self, command: str, **kwargs):
+	# a command is created for every call to Placet, so the attributes are stored in slots instead of a `__dict__`
+	__slots__ = ('command', 'timeout', 'type', 'additional_lineskip', 'no_expect', 'expect_before', 'expect_after', 'no_wait', 'buffered')
+
+	def __init__(self, command: str, *, timeout: Optional[float] = None, type: Optional[str] = None, additional_lineskip: Optional[int] = None, 
+			  expect_before: bool = True, expect_after: bool = False, no_expect: bool = False, no_wait: bool = False, buffered: bool = False, **kwargs):
 		"""
 		Parameters
 		----------
@@ -53,20 +63,33 @@ class PlacetCommand():
 		no_expect : bool
 			If `True` (default is `False`), `expect` command for the command prompt is not invoked neither before or after doing 'writing'.
 			Overwrites `expect_before` and `expect_after` parameters.
+		no_wait : bool
+			If `True` (default is `False`), neither the echoed command nor its output are read after 'writing' the command.
+			They are consumed by the prompt `expect` of the next command, so the next command must not use `no_expect`.
+			Used for the commands whose output is ignored, eg. `set`.
+		buffered : bool
+			If `True` (default is `False`), the command is not sent right away, but kept to be sent together with the 
+			following ones. Only used by [`Placet`][placetmachine.placet.placetwrap.Placet], see 
+			[`Placet.flush_commands()`][placetmachine.placet.placetwrap.Placet.flush_commands]. Should only be used for 
+			the commands that do not produce any output.
+
+		Other keyword arguments are ignored.
 		"""
 		self.command = command
-		self.timeout = kwargs.get('timeout', None)
-		self.type = kwargs.get("type") if "type" in kwargs else self._get_command_type(command) 
-		self.additional_lineskip = kwargs.get("additional_lineskip") if "additional_lineskip" in kwargs else self._additional_lineskip(self.type)
-		self.no_expect = kwargs.get('no_expect', False)
-		self.expect_before = kwargs.get('expect_before', True)
-		self.expect_after = kwargs.get('expect_after', False)
+		self.timeout = timeout
+		self.type = type if type is not None else self._get_command_type(command)
+		self.additional_lineskip = additional_lineskip if additional_lineskip is not None else self._additional_lineskip(self.type)
+		self.no_expect = no_expect
+		self.expect_before = expect_before
+		self.expect_after = expect_after
+		self.no_wait = no_wait
+		self.buffered = buffered
 
 	def _additional_lineskip(self, command_type: str) -> int:
 		"""
 		Assign the default value of additional_lineskip to a command.
 
-		If the command_type is in the list returns the default value, otherwise 0.
+		If the command_type is in `_LINESKIP` returns the default value, otherwise 0.
 		
 		Parameters
 		----------
@@ -78,21 +101,7 @@ class PlacetCommand():
 		int
 			The value of the additional_lineskip.
 		"""
-		if command_type in ["set", "RandomReset"]:
-			return 1
-		elif command_type in ["BeamlineNew", "puts", "BeamDump", "ElementGetAttribute", "ElementSetAttribute", "WriteGirderLength", "Clic", "Zero", "SaveAllPositions", "InterGirderMove", 
-		"TestNoCorrection", "ReadAllPositions", "QuadrupoleSetStrength", "InjectorBeam", "BeamRead", "SetRfGradientSingle", "make_beam_particles", "BeamDump", "BeamSaveAll",
-		"GetTransferMatrix", "BpmNumberList", "TwissPlotStep", "FirstOrder", "BeamSetToOffset", "ElementSetToOffset", "ElementAddOffset", "BpmReadings", "MoveGirder", "BpmRealign",
-		"QuadrupoleSetStrengthList", "CavitySetGradientList", "CavitySetPhaseList", "ElementSetAttributes", "TclCall", "TwissMain"]:
-			return 0
-		elif command_type in ["BeamlineSet", "TestMeasuredCorrection", "TestFreeCorrection", "TestRfAlignment"]:
-			return 2
-		elif command_type in ["TestSimpleCorrection"]:
-			return 3
-		elif command_type in ["SurveyErrorSet"]:
-			return 27
-		else:
-			return 0
+		return _LINESKIP.get(command_type, 0)
 
 	def _get_command_type(self, command: str) -> str:
 		"""
@@ -108,37 +117,57 @@ class PlacetCommand():
 		str
 			The type of the command
 		"""
-		keyword = command.split()[0]
-		if keyword in self.command_types:
+		keyword = command.split(None, 1)[0]
+		if keyword in _COMMAND_TYPES:
 			return keyword
 		else:
 			raise ValueError("Command " + keyword + " does not exist!")
 
 	def __repr__(self):
-		return f"PlacetCommand({repr(self.command)}, timeout = {self.timeout}, type = '{self.type}', additional_lineskip = {self.additional_lineskip}, expect_before = {self.expect_before}, expect_after = {self.expect_after}, no_expect = {self.no_expect})"	
+		return f"PlacetCommand({repr(self.command)}, timeout = {self.timeout}, type = '{self.type}', additional_lineskip = {self.additional_lineskip}, expect_before = {self.expect_before}, expect_after = {self.expect_after}, no_expect = {self.no_expect}, no_wait = {self.no_wait}, buffered = {self.buffered})"	
 	
 	def __str__(self):
 		return f"PlacetCommand(command = {repr(self.command)})"
 
+# the set of `PlacetCommand.command_types` for the lookups
+_COMMAND_TYPES = frozenset(PlacetCommand.command_types)
+
+# the default `additional_lineskip` of the commands, the rest have 0
+_LINESKIP = {command_type: lineskip for command_types, lineskip in [
+	(("set", "RandomReset"), 1),
+	(("BeamlineSet", "TestMeasuredCorrection", "TestFreeCorrection", "TestRfAlignment"), 2),
+	(("TestSimpleCorrection",), 3),
+	(("SurveyErrorSet",), 27)
+] for command_type in command_types}
+
+# "error"/"warning" as a separate (whitespace delimited) word, in any case
+_ERR_RE = re.compile(r'(?<!\S)(error|warning)(?!\S)', re.IGNORECASE)
+
 def error_seeker(func: Callable) -> Callable:
 	"""
 	Decorator that checks for the words "error"/"warning" in PLACET output.
 
-	Checks the output of the decorated function.
+	Checks the output of the decorated function. The output could be a line or a list of lines.
 
 	If containts "ERROR", throws an exception.
 	If containts "WARNING", throws an exception.
 	"""
 	@wraps(func)
-	def wrapper(self, timeout: float = None):
-		res = func(self, timeout) if timeout is not None else func(self)
+	def wrapper(self, *args, **kwargs):
+		res = func(self, *args, **kwargs)
+		text = res if isinstance(res, str) else "".join(res)
 
-		if "error".casefold() in list(map(lambda x: x.casefold(), res.split())):
-			self.process.close()
-			raise Exception("Process exited with an error message:\n" + res)
-		if "warning".casefold() in list(map(lambda x: x.casefold(), res.split())):
+		# a plain substring search is much faster than the regex, so the regex only confirms the words found
+		lowered = text.lower()
+		if "error" not in lowered and "warning" not in lowered:
+			return res
+		match = _ERR_RE.search(text)
+		if match is not None:
 			self.process.close()
-			raise Exception("Process encountered a warning:\n" + res)
+			# the first word found decides, unless it is a warning followed by an error
+			if match.group(1).lower() == "error" or any(word.lower() == "error" for word in _ERR_RE.findall(text, match.end())):
+				raise Exception("Process exited with an error message:\n" + text)
+			raise Exception("Process encountered a warning:\n" + text)
 		return res
 	return wrapper
 
@@ -147,19 +176,23 @@ def logging(func: Callable) -> Callable:
 	Logging decorator. 
 	
 	By default does not do anything. When debug mode is invoked prints the functions'
-	execution summary
+	execution summary. The summary is printed as an indented JSON only when `verbose_debug` 
+	is set, since the encoding is expensive for the long runs.
 	"""
+	name = func.__name__
 	@wraps(func)
 	def wrapper(self, *args, **kwargs):
-		if self.debug_mode:
-			exec_summ = dict(function = func.__name__, arguments = [args, kwargs])
+		if not self._debug_mode:
+			return func(self, *args, **kwargs)
+
+		exec_summ = dict(function = name, arguments = [args, kwargs])
+		if self._verbose_debug:
+			print(json.dumps(exec_summ, indent = 4, sort_keys = True, default = str))
+		else:
 			print(exec_summ)
-			self.debug_data = self.debug_data.append(exec_summ, ignore_index = True)
-#				print(json.dumps(exec_summ, indent = 4, sort_keys = True))
+		self._debug_rows.append(exec_summ)
 
-		res = func(self, *args, **kwargs)
-		
-		return res
+		return func(self, *args, **kwargs)
 	
 	return wrapper
 
@@ -170,7 +203,6 @@ class Placetpy(Communicator):
 	Extends [`Communicator`][placetmachine.placet.communicator.Communicator] to run **Placet**
 	and its commands of the proper format.
 	"""
-	_INTRO_LINES = 19
 	def __init__(self, name: str = "placet", **kwargs):
 		"""
 		Parameters
@@ -188,19 +220,27 @@ class Placetpy(Communicator):
 			If `True` (default is `True`) , invoking [`save_debug_info()`][placetmachine.placet.pyplacet.Placetpy.save_debug_info].
 		send_delay : float
 			The time delay before each data transfer to a child process (sometimes needed for stability).
-			Default is `Placetpy._BUFFER_MAXSIZE`.
+			Default is `Placetpy._DELAY_BEFORE_SEND` (no delay).
+		verbose_debug : bool
+			If `True` (default is `False`), the execution summaries in debug mode are printed as indented JSON.
+		echo : bool
+			If `False` (default is `True`), starts the process with the terminal echo switched off.
+			See [`Communicator`][placetmachine.placet.communicator.Communicator].
+		debug_max : int
+			The maximum number of the records kept in debug mode, the oldest ones are dropped.
+			See [`Communicator`][placetmachine.placet.communicator.Communicator].
 		"""
+		self._verbose_debug = kwargs.get("verbose_debug", False)
 		super(Placetpy, self).__init__(name, **kwargs)
 		self._show_intro = kwargs.get("show_intro", True)
 
 		self.__read_intro()
 
 	def __read_intro(self):
-		#skipping the program intro
-		for i in range(self._INTRO_LINES):
-			tmp = self.readline()
-			if self._show_intro:
-				print(tmp, end = "")
+		# skipping the program intro, everything up to the first prompt
+		intro = "".join(self.readlines())
+		if self._show_intro:
+			print(intro, end = "")
 
 	def restart(self):
 		"""Restart the child process."""
@@ -225,6 +265,28 @@ class Placetpy(Communicator):
 		"""
 		return self._readline()
 
+	@error_seeker
+	def readlines(self, N_lines: Optional[int] = None, timeout: float = Communicator._BASE_TIMEOUT) -> List[str]:
+		"""
+		Read several lines from **Placet** process.
+
+		When `N_lines` is not given, reads everything up to the next prompt with a single `expect` call.
+
+		Parameters
+		----------
+		N_lines
+			Number of lines to read. If `None` (default), reads all the lines up to the prompt.
+		timeout
+			Timeout of the reader before raising the exception.
+			*No effect anymore. The parameter is kept for compatibility.*
+
+		Returns
+		-------
+		List[str]
+			The list of the lines received from the child process.
+		"""
+		return super(Placetpy, self).readlines(N_lines, timeout)
+
 	@logging
 	def run_command(self, command: PlacetCommand, skipline: bool = True):
 		"""
@@ -250,10 +312,41 @@ class Placetpy(Communicator):
 		if command.timeout is not None:
 			opt['timeout'] = command.timeout
 
+		if command.no_wait:
+			# the output is left for the next prompt `expect` to consume
+			self.writeline(command.command, False, **opt)
+			return
 		self.writeline(command.command, skipline, **opt)
 		for x in range(command.additional_lineskip):
 			self.skipline()
 	
+	@logging
+	def run_commands(self, commands: List[PlacetCommand], skipline: bool = True):
+		"""
+		Run several commands in **Placet** within a single write.
+
+		The `expect` options are taken from the first (`expect_before`, `no_expect`) and 
+		the last (`expect_after`) commands. The Tcl shell only prints the result of the last
+		command in a line, so the commands should not produce any output, except for the last one.
+
+		**Does not return any value.**
+
+		Parameters
+		----------
+		commands
+			The commands to pass to Placet.
+		skipline
+			If `True` invokes [`skipline()`][placetmachine.placet.pyplacet.Placetpy.skipline] to read the commands back from the buffer.
+		"""
+		opt = {
+			'no_expect': commands[0].no_expect,
+			'expect_before': commands[0].expect_before,
+			'expect_after': commands[-1].expect_after
+		}
+		self.writelines([command.command for command in commands], skipline, **opt)
+		for x in range(sum(command.additional_lineskip for command in commands)):
+			self.skipline()
+
 	def __repr__(self):
 		return f"Placetpy('{self._process_name}', debug_mode = {self.debug_mode}, save_logs = {self._save_logs}, send_delay = {self._send_delay}, show_intro = {self._show_intro})"
 
@@ -0,0 +1,100 @@
+from typing import Callable, Iterable, List, Any
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import pandas as pd
+from placetmachine.machine import Machine
+
+
+class MachinePool():
+	"""
+	A class used for running independent calculations on several [`Machine`][placetmachine.machine.Machine]s in parallel.
+
+	Each `Machine` runs its own **Placet** process. The computations are done by the **Placet** processes,
+	so the jobs are dispatched with threads - while one thread waits for the output of its **Placet** process,
+	the others are running. A `Machine` is taken from the pool for each job and returned once the job is done.
+
+	Attributes
+	----------
+	machines : List[Machine]
+		The machines in the pool.
+	"""
+	def __init__(self, n_machines: int, **calc_options):
+		"""
+		Parameters
+		----------
+		n_machines
+			The number of machines (**Placet** processes) to create.
+
+		Other parameters
+		----------------
+		The parameters are passed to each [`Machine`][placetmachine.machine.Machine]. By default,
+		`console_output` and `show_intro` are set to `False`. When `cache_dir` is given, the
+		machines share the tracking results cache.
+		"""
+		calc_options = dict(dict(console_output = False, show_intro = False), **calc_options)
+		self.machines = [Machine(**calc_options) for i in range(n_machines)]
+		self._queue = queue.Queue()
+		for machine in self.machines:
+			self._queue.put(machine)
+
+	def _run(self, func: Callable, item: Any) -> Any:
+		machine = self._queue.get()
+		try:
+			return func(machine, item)
+		finally:
+			self._queue.put(machine)
+
+	def map(self, func: Callable, items: Iterable) -> List:
+		"""
+		Run `func` for each item on the free machines.
+
+		Parameters
+		----------
+		func
+			The function to run. Must have the signature `func(machine, item)`. It is responsible for
+			setting up the machine (creating the beamline, the beams, etc.).
+		items
+			The items to run `func` for (eg. the lattice files).
+
+		Returns
+		-------
+		list
+			The results of `func` in the order of `items`.
+		"""
+		with ThreadPoolExecutor(max_workers = len(self.machines)) as executor:
+			return list(executor.map(lambda item: self._run(func, item), items))
+
+	def map_seeds(self, func: Callable, seeds: Iterable[int]) -> pd.DataFrame:
+		"""
+		Run `func` for each seed on the free machines.
+
+		Before each job, the machine is reseeded with
+		[`Machine.random_reset()`][placetmachine.machine.Machine.random_reset], so the jobs
+		running on different **Placet** processes do not produce the same errors. Used for running
+		the independent machines of the statistical studies (eg. `TestNoCorrection`) in parallel.
+
+		Parameters
+		----------
+		func
+			The function to run. Must have the signature `func(machine)` and return a `DataFrame`.
+		seeds
+			The seeds to run `func` with. Should be unique.
+
+		Returns
+		-------
+		DataFrame
+			The results of `func` concatenated in the order of `seeds`, with the column `seed` added.
+		"""
+		def run_seed(machine, seed):
+			machine.random_reset(seed)
+			return func(machine).assign(seed = seed)
+
+		return pd.concat(self.map(run_seed, seeds), ignore_index = True)
+
+	def close(self):
+		"""Close all the machines (see [`Machine.close()`][placetmachine.machine.Machine.close])."""
+		for machine in self.machines:
+			machine.close()
+
+	def __repr__(self):
+		return f"MachinePool(n_machines = {len(self.machines)})"
@@ -1,28 +1,33 @@
+import numpy as np
+
+
 class CoordTransformation:
 	"""
 	Class used to store the coordinates tranformations
 	"""
 	def __init__(self, transformation_matrix):
 
-		self.transformation_matrix = transformation_matrix
+		# stored as a contiguous float array, so the multiplication does not copy it
+		self.transformation_matrix = np.ascontiguousarray(transformation_matrix, dtype = np.float64)
 
 	def transform(self, coordinates):
 		"""
 		Transform the set of the coordinates
 		---
-		Performs the matrix X vector multiplication
+		Performs the matrix X vector multiplication. Several sets of the coordinates can be
+		transformed at once (eg. all the particles of a beam), stacked as the columns of a 2D array.
 
 		Parameters
 		----------
 		coordinates: np.array
-			The set of the coordinates
+			The set of the coordinates, or the 2D array of shape `(D, N)` with `N` sets of them.
 
 		Returns
 		-------
 		np.array
-			The resulting vector
+			The resulting vector, or the 2D array of the resulting vectors
 		"""
-		return self.transformation_matrix.dot(coordinates)
+		return self.transformation_matrix @ coordinates
 
 	def __str__(self):
 		return str(self.transformation_matrix)
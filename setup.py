@@ -1,3 +1,4 @@
+import os
 from setuptools import setup, find_packages
 
 DEPENDENCIES = [
@@ -7,6 +8,13 @@ DEPENDENCIES = [
 	'numpy'
 ]
 
+# Optional compilation of the Placet commands wrapper with Cython, removing the interpreter 
+# overhead of the thin command methods. Enabled with `PLACETMACHINE_CYTHON=1 pip3 install .`
+EXT_MODULES = []
+if os.environ.get("PLACETMACHINE_CYTHON"):
+	from Cython.Build import cythonize
+	EXT_MODULES = cythonize(["placetmachine/placet/placetwrap.py"], compiler_directives = {'language_level': 3, 'boundscheck': False, 'annotation_typing': False})
+
 setup(
 	name = "placetmachine",
 	version = "0.0.1-alpha",
@@ -21,6 +29,7 @@ setup(
 		'placetmachine': ["placet_files/*"]
 	},
 	install_requires = DEPENDENCIES,
+	ext_modules = EXT_MODULES,
 	classifiers = [
 		"Intended Audience :: Science/Research",
 		"License :: OSI Approved :: MIT License",
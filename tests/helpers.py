@@ -0,0 +1,82 @@
+import contextlib
+import os
+import shutil
+import stat
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+from placetmachine.placet import Communicator, Placet
+
+# the Tcl shell stands in for Placet in the tests, the Placet commands used are emulated with procedures
+TCLSH = shutil.which("tclsh")
+
+class FakeProcessMixin:
+	"""
+	Replaces the child process of a [`Communicator`][placetmachine.placet.communicator.Communicator] subclass.
+
+	Records the prompt `expect` calls, the data written and the lines skipped.
+	"""
+	def __init__(self, echo: bool = False):
+		self._debug_mode, self._echo, self._prompt_pending, self._send_delay = False, echo, True, 0.0
+		self.process = SimpleNamespace(flag_eof = False, before = "")
+		self.n_expects, self.n_skipped, self.written = 0, 0, []
+
+	def _expect_prompt(self, timeout: float = Communicator._BASE_TIMEOUT):
+		self.n_expects += 1
+
+	def _raw_write(self, data: str):
+		self.written.append(data)
+
+	def skipline(self, timeout: float = Communicator._BASE_TIMEOUT):
+		self.n_skipped += 1
+
+	def readline(self, timeout: float = Communicator._BASE_TIMEOUT) -> str:
+		return ""
+
+@contextlib.contextmanager
+def tclsh_as_placet(stubs: tuple = ()):
+	"""
+	Run the Tcl shell instead of Placet while the context is active.
+
+	A `placet` script starting the Tcl shell is put first on the `PATH`. The shell reads `stubs` 
+	from its start up file, so the emulated Placet commands exist before the first command is sent 
+	(eg. for the scripts sourced by [`Machine`][placetmachine.machine.Machine]).
+
+	Parameters
+	----------
+	stubs
+		The Tcl procedures emulating the Placet commands.
+	"""
+	with tempfile.TemporaryDirectory() as bin_dir:
+		with open(os.path.join(bin_dir, ".tclshrc"), 'w') as f:
+			f.write("\n".join(stubs) + "\n")
+		placet_exec = os.path.join(bin_dir, "placet")
+		with open(placet_exec, 'w') as f:
+			f.write(f"#!/bin/sh\nHOME='{bin_dir}' exec tclsh \"$@\"\n")
+		os.chmod(placet_exec, os.stat(placet_exec).st_mode | stat.S_IEXEC)
+		with mock.patch.dict(os.environ, {'PATH': bin_dir + os.pathsep + os.environ['PATH']}):
+			yield
+
+def tclsh_placet(stubs: tuple = ()) -> tuple:
+	"""
+	Start [`Placet`][placetmachine.placet.placetwrap.Placet] running the Tcl shell instead of Placet.
+
+	Parameters
+	----------
+	stubs
+		The Tcl procedures emulating the Placet commands, see [`tclsh_as_placet()`][tests.helpers.tclsh_as_placet].
+
+	Returns
+	-------
+	tuple(Placet, Callable)
+		The `Placet` object and the function closing it.
+	"""
+	context = tclsh_as_placet(stubs)
+	context.__enter__()
+	placet = Placet(show_intro = False, save_logs = False)
+
+	def close():
+		placet.close()
+		context.__exit__(None, None, None)
+
+	return placet, close
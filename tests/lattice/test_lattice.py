@@ -1,7 +1,7 @@
 import unittest
 import warnings
 from placetmachine import Beamline
-from placetmachine.lattice import Quadrupole, Cavity, Drift
+from placetmachine.lattice import Quadrupole, Cavity, Drift, Knob
 
 
 class ElementElementaryTest(unittest.TestCase):
@@ -74,6 +74,47 @@ class ElementElementaryTest(unittest.TestCase):
 		self.assertFalse(test_element is self.beamline[1])
 		self.assertEqual(self.beamline[1]['name'], "test_quad2")
 
+	def test_topology_version(self):
+
+		self.assertEqual(self.beamline._topology_version, 0)
+
+		self.beamline.append(self.test_quad)
+		self.beamline.append(self.test_cavity)
+		self.assertEqual(self.beamline._topology_version, 2)
+
+		self.beamline[1] = Quadrupole({'name': "test_quad2"})
+		self.assertEqual(self.beamline._topology_version, 3)
+
+		self.beamline[0]['strength'] = 1.0
+		self.assertEqual(self.beamline._topology_version, 3)
+
+	def test_get_quads_strengths(self):
+
+		self.beamline.append(Quadrupole({'name': "quad1", 'strength': 1.0}))
+		self.beamline.append(self.test_cavity)
+		self.assertEqual(self.beamline._get_quads_strengths(), [1.0])
+
+		self.beamline[0]['strength'] = 2.0
+		self.assertEqual(self.beamline._get_quads_strengths(), [2.0])
+
+		self.beamline[1] = Quadrupole({'name': "quad2", 'strength': 3.0})
+		self.assertEqual(self.beamline._get_quads_strengths(), [2.0, 3.0])
+		self.assertEqual(self.beamline._get_cavs_gradients(), [])
+
+	def test_attach_knob(self):
+
+		self.beamline.append(self.test_quad)
+		knob = Knob([self.beamline[0]], [{'y': {'amplitude': 1.0}}])
+
+		self.beamline.attach_knob(knob)
+		self.assertEqual(self.beamline.attached_knobs, [knob])
+
+		with warnings.catch_warnings(record = True) as warning_list:
+			self.beamline.attach_knob(knob)
+
+		self.assertEqual(len(warning_list), 1)
+		self.assertEqual(self.beamline.attached_knobs, [knob])
+
 	def test_setitem2(self):
 
 		#creating 2 girders
@@ -0,0 +1,118 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from placetmachine.placet import Communicator
+from tests.helpers import FakeProcessMixin, TCLSH
+
+class FakeCommunicator(FakeProcessMixin, Communicator):
+	"""`Communicator` with the process replaced, counting the prompt `expect` calls."""
+
+class TclshCommunicator(Communicator):
+	"""`Communicator` running the Tcl shell."""
+	def readline(self) -> str:
+		return self._readline()
+
+class CommunicatorTest(unittest.TestCase):
+
+	def setUp(self):
+
+		self.communicator = FakeCommunicator()
+
+	def test_writeline(self):
+
+		self.communicator.writeline("a\n")
+		self.communicator.writeline("b\n")
+		self.assertEqual(self.communicator.n_expects, 2)
+		self.assertEqual(self.communicator.written, ["a\n", "b\n"])
+		self.assertTrue(self.communicator._prompt_pending)
+
+	def test_writeline_expect_after(self):
+
+		self.communicator.writeline("a\n", expect_after = True)
+		self.assertEqual(self.communicator.n_expects, 2)
+		self.assertFalse(self.communicator._prompt_pending)
+
+		self.communicator.writeline("b\n")
+		self.assertEqual(self.communicator.n_expects, 2)
+		self.assertTrue(self.communicator._prompt_pending)
+
+	def test_readlines(self):
+
+		self.communicator.writeline("a\n")
+		self.communicator.readlines()
+		self.assertEqual(self.communicator.n_expects, 2)
+
+		self.communicator.writeline("b\n")
+		self.assertEqual(self.communicator.n_expects, 2)
+
+	def test_no_expect(self):
+
+		self.communicator.writeline("a\n", no_expect = True)
+		self.communicator.writeline("b\n", no_expect = True)
+		self.assertEqual(self.communicator.n_expects, 0)
+		self.assertTrue(self.communicator._prompt_pending)
+
+
+	def test_raw_write_fallback_delay(self):
+
+		communicator = TclshCommunicator.__new__(TclshCommunicator)
+		communicator._send_delay = 0.0
+		communicator.process = SimpleNamespace(delaybeforesend = None, logfile_send = None, encoding = "utf-8", child_fd = -1)
+		with mock.patch('placetmachine.placet.communicator.os.write', side_effect = [OSError("busy"), 2]) as write:
+			with mock.patch('placetmachine.placet.communicator.time.sleep'):
+				communicator._raw_write("a\n")
+		self.assertEqual(write.call_count, 2)
+		self.assertEqual(bytes(write.call_args[0][1]), b"a\n")
+		self.assertEqual(communicator._send_delay, Communicator._FALLBACK_DELAY_BEFORE_SEND)
+
+		# with the delay already set, the failure is not hidden
+		with mock.patch('placetmachine.placet.communicator.os.write', side_effect = OSError("busy")):
+			with self.assertRaises(OSError):
+				communicator._raw_write("a\n")
+
+@unittest.skipUnless(TCLSH, "tclsh is not available")
+class CommunicatorTclshTest(unittest.TestCase):
+
+	def setUp(self):
+
+		self.communicator = TclshCommunicator("tclsh", save_logs = False)
+
+	def tearDown(self):
+
+		self.communicator.close()
+
+	def test_writeline(self):
+
+		self.communicator.writeline("set a 5\n")
+		self.assertEqual(self.communicator.readline().strip(), "5")
+		self.communicator.writeline("puts [expr {$a + 1}]\n")
+		self.assertEqual(self.communicator.readline().strip(), "6")
+
+	def test_writelines(self):
+
+		self.communicator.writelines(["set a 1\n", "set b 2\n", "puts [expr {$a + $b}]\n"])
+		self.assertEqual(self.communicator.readline().strip(), "3")
+
+	def test_long_line(self):
+
+		# the pty takes up to 4095 characters per line in the canonical mode
+		value = "x" * 4000
+		self.communicator.writeline(f"set a {value}; puts [string length $a]\n")
+		self.assertEqual(self.communicator.readline().strip(), "4000")
+
+	def test_read_until_prompt(self):
+
+		self.communicator.writeline("puts 1; puts 2\n")
+		self.assertEqual(self.communicator.read_until_prompt().split(), ["1", "2"])
+		# the prompt is consumed, so the next command is written right away
+		self.assertFalse(self.communicator._prompt_pending)
+		self.communicator.writeline("puts 3\n")
+		self.assertEqual(self.communicator.readline().strip(), "3")
+
+	def test_slow_command(self):
+
+		self.communicator.writeline("after 1500\n")
+		self.communicator.writeline("puts 1\n")
+		self.assertEqual(self.communicator.readline().strip(), "1")
+		# a slow command does not switch on the send delay
+		self.assertEqual(self.communicator._send_delay, 0.0)
@@ -0,0 +1,47 @@
+import unittest
+import io
+import numpy as np
+from placetmachine.placet.placetwrap import _parse_matrix
+from tests.helpers import TCLSH, tclsh_placet
+
+class ParseMatrixTest(unittest.TestCase):
+
+	def test_parse_matrix(self):
+
+		matrix = _parse_matrix("{1.0 0.5 0} {0 1 2.5e-3}\n")
+		self.assertEqual(matrix.shape, (2, 3))
+		np.testing.assert_array_equal(matrix, [[1.0, 0.5, 0.0], [0.0, 1.0, 2.5e-3]])
+
+	def test_parse_matrix_ragged(self):
+
+		with self.assertRaises(ValueError):
+			_parse_matrix("{1.0 0.5} {0 1 0}")
+
+	def test_parse_matrix_no_rows(self):
+
+		with self.assertRaises(ValueError):
+			_parse_matrix("1.0 0.5 0 1")
+
+@unittest.skipUnless(TCLSH, "tclsh is not available")
+class PlacetTclshTest(unittest.TestCase):
+
+	def setUp(self):
+
+		self.placet, self.close_placet = tclsh_placet()
+
+	def tearDown(self):
+
+		self.close_placet()
+
+	def test_set_tcl_list(self):
+
+		values = [0.5] * 2000
+		self.placet.process.logfile_read = log = io.StringIO()
+		self.placet.set_tcl_list("values", values)
+		self.placet.readlines()
+		# only the commands are echoed back, not the list accumulated after every chunk
+		self.assertLess(len(log.getvalue()), 2 * len("0.5 " * len(values)))
+
+		self.placet.process.logfile_read = None
+		self.placet._custom_command("puts [llength $values]\n", type = "custom", additional_lineskip = 0)
+		self.assertEqual(self.placet.readline().strip(), "2000")
@@ -0,0 +1,71 @@
+import unittest
+from placetmachine.placet.pyplacet import Placetpy, PlacetCommand
+from tests.helpers import FakeProcessMixin, TCLSH
+
+class FakePlacetpy(FakeProcessMixin, Placetpy):
+	"""`Placetpy` with the process replaced, the echoed commands are counted as skipped lines."""
+	def __init__(self):
+		super(FakePlacetpy, self).__init__(echo = True)
+
+class PlacetpyTest(unittest.TestCase):
+
+	def setUp(self):
+
+		self.placet = FakePlacetpy()
+
+	def test_run_command(self):
+
+		self.placet.run_command(PlacetCommand("set a 1\n"))
+		self.assertEqual(self.placet.written, ["set a 1\n"])
+		self.assertEqual(self.placet.n_skipped, 2)
+
+	def test_run_command_no_wait(self):
+
+		command = PlacetCommand("set a 1\n", no_wait = True)
+		self.assertTrue(command.no_wait)
+		self.assertFalse(PlacetCommand("set a 1\n").no_wait)
+
+		self.placet.run_command(command)
+		self.assertEqual(self.placet.written, ["set a 1\n"])
+		self.assertEqual(self.placet.n_skipped, 0)
+		self.assertTrue(self.placet._prompt_pending)
+
+	def test_command_buffered(self):
+
+		self.assertTrue(PlacetCommand("Zero\n", buffered = True).buffered)
+		self.assertFalse(PlacetCommand("Zero\n").buffered)
+
+@unittest.skipUnless(TCLSH, "tclsh is not available")
+class PlacetpyTclshTest(unittest.TestCase):
+
+	def setUp(self):
+
+		self.placet = Placetpy("tclsh", show_intro = False, save_logs = False)
+
+	def tearDown(self):
+
+		self.placet.close()
+
+	def test_run_command(self):
+
+		self.placet.run_command(PlacetCommand("set a 7\n"))
+		self.placet.run_command(PlacetCommand("puts [expr {$a * 2}]\n", type = "custom"))
+		self.assertEqual(self.placet.readline().strip(), "14")
+
+	def test_run_command_no_wait(self):
+
+		self.placet.run_command(PlacetCommand("set a 1\n", no_wait = True))
+		self.placet.run_command(PlacetCommand("set a 2\n", no_wait = True))
+		self.placet.run_command(PlacetCommand("puts $a\n", type = "custom"))
+		self.assertEqual(self.placet.readline().strip(), "2")
+
+	def test_readlines(self):
+
+		self.placet.run_command(PlacetCommand("puts 1; puts 2; puts 3\n", type = "custom"))
+		self.assertEqual([line.strip() for line in self.placet.readlines()], ["1", "2", "3"])
+
+	def test_error(self):
+
+		self.placet.run_command(PlacetCommand("puts \"ERROR in the command\"\n", type = "custom"))
+		with self.assertRaises(Exception):
+			self.placet.readline()
@@ -1 +1,169 @@
-import unittest
\ No newline at end of file
+import unittest
+import os
+import tempfile
+import pandas as pd
+from placetmachine import Machine, Beamline
+from placetmachine.lattice import Bpm
+from placetmachine.beam import Beam
+from placetmachine.placet.placetwrap import _PLACET_POOL
+from tests.helpers import TCLSH, tclsh_as_placet
+
+# the Placet commands used by `Machine`, emulated in Tcl. The BPMs read the offsets from the positions 
+# file loaded by the survey, so the readings only change when the offsets reach "Placet"
+_PLACET_STUBS = [
+	"proc _option {args name} {lindex $args [expr {[lsearch $args -$name] + 1}]}",
+	"foreach command {WakeSet BeamlineNew Bpm TclCall InjectorBeam SetRfGradientSingle BeamRead} {proc $command args {}}",
+	"proc InjectorCavityDefine {args} {puts cavity; puts defined}",
+	"proc BeamlineSet {args} {puts beamline; puts set}",
+	"proc Zero {args} {global n_zero; incr n_zero; return}",
+	"proc SurveyErrorSet {args} {global survey_errors; set survey_errors $args; for {set i 0} {$i < 27} {incr i} {puts set}}",
+	"proc RandomReset {args} {puts \"seed [_option $args seed]\"}",
+	"proc ReadAllPositions {args} {global positions; set positions [_option $args file]; return}",
+	"proc TestNoCorrection {args} {[_option $args survey]; puts \"emitt_x 1.0\"; puts \"emitt_y 1.0\"}",
+	"proc SaveAllPositions {args} {global positions; file copy -force $positions [_option $args file]; return}",
+	"proc TestSimpleCorrection {args} {global positions n_corrections; [_option $args survey]; incr n_corrections; "
+		"set f [open $positions]; set out [open $positions.corrected w]; while {[gets $f line] >= 0} {set values {}; "
+		"foreach value $line {lappend values [expr {$value / 2.0}]}; puts $out $values}; close $f; close $out; "
+		"set positions $positions.corrected; puts 1; puts 2; puts 3; puts \"1 2.0 3 4\"; puts 5}",
+	"proc BpmReadings {args} {global positions; set f [open $positions]; set out [open [_option $args file] w]; "
+		"while {[gets $f line] >= 0} {puts $out \"0 [lindex $line 2] [lindex $line 0]\"}; close $f; close $out; return}"
+]
+
+_CAVITIES_SETUP = dict(a = 3.33e-3, g = 6.4e-3, l = 8.33333e-3, delta = 0.18, delta_g = 0.5e-3, phase = 8.0, frac_lambda = 0.25, scale = 1.0)
+
+_BEAM_SETUP = dict(charge = 5.2e9, beta_x = 8.05, beta_y = 1.2, alpha_x = 2.46, alpha_y = -1.9, emitt_x = 8.9, emitt_y = 0.1, 
+	e_spread = 1.6, e_initial = 9.0, sigma_z = 70.0, n_total = 500)
+
+@unittest.skipUnless(TCLSH, "tclsh is not available")
+class TclMachineTest(unittest.TestCase):
+	"""`Machine` with a single BPM, running the Tcl shell instead of Placet."""
+
+	machine_options = {}
+
+	def setUp(self):
+
+		context = tclsh_as_placet(_PLACET_STUBS)
+		context.__enter__()
+		self.addCleanup(context.__exit__, None, None, None)
+
+		self.machine = self.make_machine()
+		self.addCleanup(lambda: self.machine.close())
+		self.beam = self.machine.make_beam_slice_energy_gradient("test_beam", 8, 1, 1.0, 1.0, beam_seed = 1, **_BEAM_SETUP)
+
+	def make_machine(self, beamline_name: str = "test_beamline") -> Machine:
+
+		machine = Machine(show_intro = False, console_output = False, **self.machine_options)
+		beamline = Beamline(beamline_name)
+		beamline.append(Bpm({'name': "test_bpm", 's': 1.0}))
+		machine.import_beamline(beamline, cavities_setup = _CAVITIES_SETUP)
+		return machine
+
+class MachineOrbitTest(TclMachineTest):
+
+	def test_eval_orbit_misaligned(self):
+
+		orbit = self.machine.eval_orbit(self.beam)
+		self.assertEqual((orbit['x'][0], orbit['y'][0]), (0.0, 0.0))
+
+		self.machine.misalign_element(element_index = 0, x = 5.0, y = -3.0)
+		orbit = self.machine.eval_orbit(self.beam)
+		self.assertEqual((orbit['x'][0], orbit['y'][0]), (5.0, -3.0))
+		self.assertEqual(self.machine.beamline.lattice[0].settings['reading_x'], 5.0)
+
+	def test_eval_orbit_unknown_beam(self):
+
+		with self.assertRaises(ValueError):
+			self.machine.eval_orbit(Beam("other_beam", self.machine.placet))
+
+class MachineTrackTest(TclMachineTest):
+
+	def test_track_label_columns(self):
+
+		res = self.machine.track(self.beam)
+		for column in ['correction', 'beam', 'beamline', 'survey', 'positions_file']:
+			self.assertIsInstance(res[column].dtype, pd.CategoricalDtype)
+		self.assertEqual((res['beam'][0], res['beamline'][0]), ("test_beam", "test_beamline"))
+		self.assertEqual(res['emitty'][0], 1.0)
+
+class MachineReuseTest(TclMachineTest):
+
+	machine_options = dict(reuse_placet = True)
+
+	def setUp(self):
+
+		def close_pool():
+			while _PLACET_POOL:
+				_PLACET_POOL.pop()[0].close()
+		self.addCleanup(close_pool)
+		super(MachineReuseTest, self).setUp()
+
+	def test_reuse_placet(self):
+
+		placet = self.machine.placet
+		self.machine.survey_errors_set(quadrupole_y = 5.0)
+		self.machine.close()
+
+		self.machine = Machine(show_intro = False, console_output = False, **self.machine_options)
+		self.assertIs(self.machine.placet, placet)
+		# the offsets of the previous beamline are zeroed and no beamline is selected
+		self.assertEqual(placet.puts("n_zero").strip(), "1")
+		self.assertIsNone(placet._current_beamline)
+		self.assertIn("-quadrupole_y 0.0", placet.puts("survey_errors"))
+
+		# the names used by the previous `Machine` are taken
+		with self.assertRaises(Exception):
+			self.machine.import_beamline(Beamline("test_beamline"))
+		beamline = Beamline("test_beamline_2")
+		beamline.append(Bpm({'name': "test_bpm", 's': 1.0}))
+		self.machine.import_beamline(beamline, cavities_setup = _CAVITIES_SETUP)
+		beam = self.machine.make_beam_slice_energy_gradient("test_beam_2", 8, 1, 1.0, 1.0, beam_seed = 1, **_BEAM_SETUP)
+		orbit = self.machine.eval_orbit(beam)
+		self.assertEqual((orbit['x'][0], orbit['y'][0]), (0.0, 0.0))
+
+class MachineCacheTest(TclMachineTest):
+
+	def setUp(self):
+
+		self.cache_dir = tempfile.TemporaryDirectory()
+		self.addCleanup(self.cache_dir.cleanup)
+		self.machine_options = dict(cache_dir = self.cache_dir.name)
+		super(MachineCacheTest, self).setUp()
+
+	def test_track_cache_key(self):
+
+		self.machine.track(self.beam)
+		self.machine.track(self.beam)
+		self.assertEqual(len(os.listdir(self.cache_dir.name)), 1)
+
+		beam = self.machine.make_beam_slice_energy_gradient("test_beam_2", 8, 1, 1.0, 1.0, beam_seed = 2, **_BEAM_SETUP)
+		self.machine.track(beam)
+		self.machine.cavities_setup(**dict(_CAVITIES_SETUP, phase = 0.0))
+		self.machine.track(self.beam)
+		self.machine.random_reset(seed = 5)
+		self.machine.track(self.beam)
+		self.machine.misalign_element(element_index = 0, x = 5.0)
+		self.machine.track(self.beam)
+		self.assertEqual(len(os.listdir(self.cache_dir.name)), 5)
+
+	def test_track_no_cache_particle_beam(self):
+
+		beam = self.machine.make_beam_many("test_particle_beam", 8, 10, **_BEAM_SETUP)
+		self.machine.track(beam)
+		self.assertEqual(os.listdir(self.cache_dir.name), [])
+
+	def test_one_2_one_cache(self):
+
+		self.machine.misalign_element(element_index = 0, x = 4.0, y = -2.0)
+		res = self.machine.one_2_one(self.beam)
+		self.assertEqual((self.machine.beamline.lattice[0].settings['x'], self.machine.beamline.lattice[0].settings['y']), (2.0, -1.0))
+
+		# the same misalignments again, the corrected ones are read from the cache
+		self.machine.misalign_element(element_index = 0, x = 2.0, y = -1.0)
+		cached_res = self.machine.one_2_one(self.beam)
+		self.assertEqual((self.machine.beamline.lattice[0].settings['x'], self.machine.beamline.lattice[0].settings['y']), (2.0, -1.0))
+		self.assertEqual(self.machine.placet.puts("n_corrections").strip(), "1")
+		self.assertTrue(cached_res.equals(res))
+
+		self.machine.one_2_one(self.beam, no_cache = True)
+		self.assertEqual(self.machine.beamline.lattice[0].settings['x'], 1.0)
+		self.assertEqual(self.machine.placet.puts("n_corrections").strip(), "2")